@@ -0,0 +1,249 @@
+import asyncio
+from contextlib import aclosing
+from dataclasses import dataclass, field
+import itertools
+import json
+from logging import Logger
+import signal
+from typing import Optional
+from urllib.parse import parse_qsl, urlsplit
+
+from application.usecases.searches_for_flights import FlightSearchUseCase
+from infrastructure.base_browser import BrowserLauncher
+from infrastructure.config_browser import ServerConfig
+from infrastructure.metrics import NullTracer, RecordingTracer, Tracer
+from infrastructure.schemas.search import FlightSearchRequest
+from infrastructure.structured_logger import correlation_scope
+
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 429: 'Too Many Requests', 503: 'Service Unavailable'}
+
+# Marks the end of a job's result stream
+_DONE = object()
+
+
+class _BodyTooLarge(ValueError):
+    pass
+
+
+@dataclass
+class SearchJob:
+    request: FlightSearchRequest
+    results: asyncio.Queue = field(default_factory=asyncio.Queue)
+    cancelled: bool = False
+
+
+@dataclass
+class SearchDaemon:
+    """
+    A long-running process that accepts FlightSearchRequest JSON over HTTP
+    (TCP or Unix socket), queues it by priority and streams flights back as
+    NDJSON while the browser pool stays warm between requests.
+
+        POST /search?priority=0   lower priority values run first
+        GET  /ready               200 while accepting work, 503 otherwise
+        GET  /health              queue and worker counters, selector resolve profile
+        GET  /metrics             step latency histograms in the Prometheus text format
+    """
+    use_case: FlightSearchUseCase
+    launcher: BrowserLauncher
+    config: ServerConfig
+    logger: Logger
+    tracer: Tracer = field(default_factory=NullTracer)
+    accepting: bool = field(default=False, init=False)
+    completed: int = field(default=0, init=False)
+    failed: int = field(default=0, init=False)
+    running: int = field(default=0, init=False)
+    _queue: Optional[asyncio.PriorityQueue] = field(default=None, init=False)
+    _workers: list[asyncio.Task] = field(default_factory=list, init=False)
+    _server: Optional[asyncio.AbstractServer] = field(default=None, init=False)
+    _order: itertools.count = field(default_factory=itertools.count, init=False)
+
+    async def serve(self) -> None:
+        """
+        Serves until SIGTERM or SIGINT, then drains queued work and exits.
+        """
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, stop.set)
+        await self.start()
+        try:
+            await stop.wait()
+        finally:
+            await self.shutdown()
+
+    async def start(self) -> None:
+        self._queue = asyncio.PriorityQueue(maxsize=self.config.max_queue)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.config.workers)]
+        if self.config.unix_socket:
+            self._server = await asyncio.start_unix_server(self._handle, path=self.config.unix_socket)
+            where = self.config.unix_socket
+        else:
+            self._server = await asyncio.start_server(self._handle, self.config.host, self.config.port)
+            where = f'{self.config.host}:{self.config.port}'
+        self.accepting = True
+        self.logger.info('Search daemon listening on %s with %s workers', where, self.config.workers)
+
+    async def shutdown(self) -> None:
+        """
+        Stops accepting work, lets queued searches finish within the drain
+        timeout, then stops the workers and the browser pool.
+        """
+        self.accepting = False
+        self.logger.info('Draining %s queued searches', self._queue.qsize())
+        if self._server is not None:
+            self._server.close()
+        try:
+            await asyncio.wait_for(self._queue.join(), self.config.drain_timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning('Drain timeout reached, cancelling remaining searches')
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        # searches no worker picked up still have a client waiting on their results
+        while not self._queue.empty():
+            _, _, job = self._queue.get_nowait()
+            job.results.put_nowait(RuntimeError('Search cancelled during shutdown'))
+            self._queue.task_done()
+        if self._server is not None:
+            await self._server.wait_closed()
+        await self.launcher.close()
+        self.logger.info('Search daemon stopped')
+
+    async def _work(self) -> None:
+        while True:
+            _, _, job = await self._queue.get()
+            self.running += 1
+            try:
+                if not job.cancelled:
+                    # the stream is closed in this task, inside the scope it logged under
+                    with correlation_scope():
+                        async with aclosing(self.use_case.execute_stream(job.request)) as stream:
+                            async for flight in stream:
+                                if job.cancelled:
+                                    break
+                                job.results.put_nowait(flight)
+                self.completed += 1
+                job.results.put_nowait(_DONE)
+            except asyncio.CancelledError:
+                job.results.put_nowait(RuntimeError('Search cancelled during shutdown'))
+                raise
+            except Exception as e:
+                self.failed += 1
+                job.results.put_nowait(e)
+            finally:
+                self.running -= 1
+                self._queue.task_done()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            method, target, body = await self._read_request(reader)
+            url = urlsplit(target)
+            if url.path == '/ready':
+                await self._respond(writer, 200 if self.accepting else 503, {'ready': self.accepting})
+            elif url.path == '/health':
+                await self._respond(writer, 200, {
+                    'accepting': self.accepting,
+                    'queued': self._queue.qsize(),
+                    'running': self.running,
+                    'completed': self.completed,
+                    'failed': self.failed,
+                    'selectors': self.use_case.browser_service.selector_profile.report(),
+                })
+            elif url.path == '/metrics':
+                if isinstance(self.tracer, RecordingTracer):
+                    body = self.tracer.export_prometheus().encode()
+                    writer.write(self._head(200, 'text/plain; version=0.0.4', len(body)) + body)
+                    await writer.drain()
+                else:
+                    await self._respond(writer, 404, {'error': 'metrics are disabled, see MetricsConfig.enabled'})
+            elif url.path != '/search':
+                await self._respond(writer, 404, {'error': 'not found'})
+            elif method != 'POST':
+                await self._respond(writer, 405, {'error': 'use POST'})
+            else:
+                await self._search(writer, body, dict(parse_qsl(url.query)))
+        except _BodyTooLarge as e:
+            await self._respond(writer, 413, {'error': str(e)})
+        except ValueError as e:
+            await self._respond(writer, 400, {'error': str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _search(self, writer: asyncio.StreamWriter, body: bytes, query: dict[str, str]) -> None:
+        if not self.accepting:
+            await self._respond(writer, 503, {'error': 'shutting down'})
+            return
+        try:
+            data = json.loads(body or b'{}')
+            if not isinstance(data, dict):
+                raise ValueError('expected a JSON object')
+            priority = data.pop('priority', 0)
+            priority = int(query['priority'] if 'priority' in query else priority)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f'Invalid request body: {e}') from e
+        job = SearchJob(FlightSearchRequest.from_dict(data))
+        try:
+            self._queue.put_nowait((priority, next(self._order), job))
+        except asyncio.QueueFull:
+            await self._respond(writer, 429, {'error': 'queue full', 'queued': self._queue.qsize()})
+            return
+
+        writer.write(self._head(200, 'application/x-ndjson', chunked=True))
+        count = 0
+        try:
+            while True:
+                item = await job.results.get()
+                if item is _DONE:
+                    line = {'status': 'done', 'count': count}
+                elif isinstance(item, Exception):
+                    line = {'status': 'error', 'error': str(item), 'count': count}
+                else:
+                    count += 1
+                    await self._write_chunk(writer, json.dumps(item.to_dict(), ensure_ascii=False) + '\n')
+                    continue
+                await self._write_chunk(writer, json.dumps(line) + '\n')
+                break
+            writer.write(b'0\r\n\r\n')
+            await writer.drain()
+        except ConnectionError:
+            job.cancelled = True
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> tuple[str, str, bytes]:
+        request_line = (await reader.readline()).decode('latin-1').split()
+        if len(request_line) < 2:
+            raise ValueError('Malformed request line')
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get('content-length') or 0)
+        if length > self.config.max_body:
+            raise _BodyTooLarge('Request body too large')
+        body = await reader.readexactly(length) if length else b''
+        return request_line[0].upper(), request_line[1], body
+
+    def _head(self, status: int, content_type: str, length: Optional[int] = None, chunked: bool = False) -> bytes:
+        lines = [f'HTTP/1.1 {status} {_REASONS.get(status, "")}', f'Content-Type: {content_type}', 'Connection: close']
+        if chunked:
+            lines.append('Transfer-Encoding: chunked')
+        elif length is not None:
+            lines.append(f'Content-Length: {length}')
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        writer.write(self._head(status, 'application/json', len(body)) + body)
+        await writer.drain()
+
+    async def _write_chunk(self, writer: asyncio.StreamWriter, text: str) -> None:
+        data = text.encode()
+        writer.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+        await writer.drain()
@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+
+from domain.entities.flight import Flight
+from infrastructure.schemas.search import FlightSearchRequest
+
+
+class FlightProvider(ABC):
+    """
+    One carrier or travel agency site that can answer a flight search.
+    Implementations bring their own site URL, selectors and flow; the
+    request's `url` is ignored.
+    """
+    name: str
+    hedge: bool = True # Whether a slow search may be raced by a second attempt
+
+    @abstractmethod
+    async def search(self, request: FlightSearchRequest) -> list[Flight]: ...
@@ -0,0 +1,132 @@
+import asyncio
+from dataclasses import dataclass, field
+from enum import Enum
+from logging import Logger
+import time
+from typing import Optional
+
+from application.providers.base import FlightProvider
+from domain.entities.flight import Flight
+from infrastructure.config_browser import FanOutConfig
+from infrastructure.schemas.search import FlightSearchRequest
+
+
+class ProviderStatus(Enum):
+    OK = 'ok'
+    FAILED = 'failed'
+    TIMED_OUT = 'timed_out' # Still running at the deadline and cancelled
+
+
+@dataclass
+class ProviderResult:
+    provider: str
+    status: ProviderStatus
+    flights: list[Flight] = field(default_factory=list)
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    hedged: bool = False # A second attempt was started
+
+
+@dataclass
+class FanOutResult:
+    """
+    Flights from every provider that answered before the deadline, cheapest
+    first, with the status of each provider.
+    """
+    flights: list[Flight]
+    providers: list[ProviderResult]
+    elapsed: float
+
+    @property
+    def complete(self) -> bool:
+        return all(result.status is ProviderStatus.OK for result in self.providers)
+
+    def to_dict(self) -> dict:
+        return {
+            'flights': [flight.to_dict() for flight in self.flights],
+            'providers': [
+                {
+                    'provider': result.provider,
+                    'status': result.status.value,
+                    'flights': len(result.flights),
+                    'error': result.error,
+                    'elapsed': round(result.elapsed, 3),
+                    'hedged': result.hedged,
+                }
+                for result in self.providers
+            ],
+            'elapsed': round(self.elapsed, 3),
+        }
+
+
+@dataclass
+class FanOutSearch:
+    """
+    Queries every provider concurrently and answers by `config.deadline`
+    with whatever arrived; providers still running are cancelled. A provider
+    slower than `config.hedge_after` gets a second attempt and the first
+    attempt to succeed wins.
+    """
+    providers: list[FlightProvider]
+    config: FanOutConfig
+    logger: Logger
+    _cleanup: set = field(default_factory=set, init=False, repr=False)
+
+    async def search(self, request: FlightSearchRequest, deadline: Optional[float] = None) -> FanOutResult:
+        started = time.perf_counter()
+        deadline = self.config.deadline if deadline is None else deadline
+        if not self.providers:
+            return FanOutResult([], [], 0.0)
+        tasks = {
+            asyncio.create_task(self._query(provider, request, started)): provider
+            for provider in self.providers
+        }
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+            # cancelled searches still release their browser leases, without holding up the answer
+            self._cleanup.add(task)
+            task.add_done_callback(self._cleanup.discard)
+
+        results = []
+        for task, provider in tasks.items():
+            if task in done:
+                results.append(task.result())
+            else:
+                self.logger.warning("Provider %s missed the %.1fs deadline", provider.name, deadline)
+                results.append(ProviderResult(provider.name, ProviderStatus.TIMED_OUT, elapsed=deadline))
+        flights = [flight for result in results for flight in result.flights]
+        flights.sort(key=lambda flight: (flight.price_minor is None, flight.price_minor or 0))
+        return FanOutResult(flights, results, time.perf_counter() - started)
+
+    async def _query(self, provider: FlightProvider, request: FlightSearchRequest, started: float) -> ProviderResult:
+        attempts = [asyncio.create_task(provider.search(request))]
+        hedge_at = self.config.hedge_after if provider.hedge else None
+        hedged = False
+        error: Optional[BaseException] = None
+        try:
+            while attempts:
+                timeout = None
+                if hedge_at is not None and not hedged:
+                    timeout = max(0.0, hedge_at - (time.perf_counter() - started))
+                done, _ = await asyncio.wait(attempts, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.logger.info("Provider %s is slower than %.1fs, hedging", provider.name, hedge_at)
+                    attempts.append(asyncio.create_task(provider.search(request)))
+                    hedged = True
+                    continue
+                for task in done:
+                    attempts.remove(task)
+                    if task.exception() is None:
+                        elapsed = time.perf_counter() - started
+                        return ProviderResult(provider.name, ProviderStatus.OK, task.result(), elapsed=elapsed, hedged=hedged)
+                    error = task.exception()
+                    self.logger.warning("Provider %s failed: %s", provider.name, error)
+            elapsed = time.perf_counter() - started
+            return ProviderResult(provider.name, ProviderStatus.FAILED, error=str(error), elapsed=elapsed, hedged=hedged)
+        finally:
+            # the losing or abandoned attempts finish releasing their browsers in the background
+            for task in attempts:
+                task.cancel()
+                self._cleanup.add(task)
+                task.add_done_callback(self._cleanup.discard)
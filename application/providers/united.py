@@ -0,0 +1,19 @@
+from dataclasses import dataclass, replace
+
+from application.providers.base import FlightProvider
+from application.usecases.searches_for_flights import FlightSearchUseCase
+from domain.entities.flight import Flight
+from infrastructure.schemas.search import FlightSearchRequest
+
+
+@dataclass
+class UnitedProvider(FlightProvider):
+    """
+    united.com, driven by FlightSearchUseCase and the default SelectorConfig.
+    """
+    use_case: FlightSearchUseCase
+    url: str = 'https://www.united.com/en/gb'
+    name: str = 'united'
+
+    async def search(self, request: FlightSearchRequest) -> list[Flight]:
+        return await self.use_case.execute(replace(request, url=self.url))
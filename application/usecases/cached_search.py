@@ -0,0 +1,72 @@
+import asyncio
+from dataclasses import dataclass, field
+from logging import Logger
+
+from application.usecases.searches_for_flights import FlightSearchUseCase
+from domain.entities.flight import Flight
+from infrastructure.config_browser import CacheConfig
+from infrastructure.result_cache import ResultCache
+from infrastructure.schemas.search import FlightSearchRequest
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+
+
+@dataclass
+class CachedFlightSearchUseCase:
+    """
+    Serves repeated searches from a result cache. Concurrent identical requests
+    share one in-flight scrape instead of each opening a browser.
+    """
+    use_case: FlightSearchUseCase
+    cache: ResultCache
+    config: CacheConfig
+    logger: Logger
+    stats: CacheStats = field(default_factory=CacheStats)
+    _inflight: dict[str, asyncio.Task] = field(default_factory=dict, init=False)
+
+    async def execute(self, flight_data: FlightSearchRequest) -> list[Flight]:
+        if not self.config.enabled:
+            return await self.use_case.execute(flight_data)
+
+        key = flight_data.cache_key()
+        entry = await self.cache.get(key)
+        if entry is not None and entry.age <= self.config.ttl:
+            self.stats.hits += 1
+            return list(entry.flights)
+        if entry is not None and entry.age <= self.config.ttl + self.config.stale_while_revalidate:
+            self.stats.stale_hits += 1
+            if key not in self._inflight:
+                self._start_scrape(key, flight_data).add_done_callback(self._log_refresh_failure)
+            return list(entry.flights)
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats.coalesced += 1
+        else:
+            self.stats.misses += 1
+            task = self._start_scrape(key, flight_data)
+        # a cancelled caller must not cancel the scrape other callers are waiting on
+        return list(await asyncio.shield(task))
+
+    def _start_scrape(self, key: str, flight_data: FlightSearchRequest) -> asyncio.Task:
+        task = asyncio.create_task(self._scrape(key, flight_data))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def _scrape(self, key: str, flight_data: FlightSearchRequest) -> list[Flight]:
+        flights = await self.use_case.execute(flight_data)
+        # an empty page usually means the results never rendered, so it is not cached
+        if flights:
+            await self.cache.set(key, flights)
+        return flights
+
+    def _log_refresh_failure(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.error('Background cache refresh failed: %s', task.exception())
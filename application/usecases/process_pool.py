@@ -0,0 +1,199 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from logging import Logger
+import multiprocessing
+import queue
+import time
+from typing import AsyncIterator, Callable, Iterable, Optional
+
+from application.usecases.searches_for_flights import FlightSearchUseCase, SearchOutcome
+from infrastructure.base_browser import BrowserLauncher
+from infrastructure.config_browser import ProcessPoolConfig
+from infrastructure.schemas.search import FlightSearchRequest
+
+
+UseCaseFactory = Callable[[], tuple[FlightSearchUseCase, BrowserLauncher]]
+
+
+def container_use_case() -> tuple[FlightSearchUseCase, BrowserLauncher]:
+    """
+    Default worker factory: the use case and launcher from the application container.
+    """
+    from settings.containers import get_container
+
+    container = get_container()
+    return container.resolve(FlightSearchUseCase), container.resolve(BrowserLauncher)
+
+
+def _worker_main(worker_id: int, generation: int, factory: UseCaseFactory, concurrency: int, inbox, outbox) -> None:
+    asyncio.run(_worker_loop(worker_id, generation, factory, concurrency, inbox, outbox))
+
+
+async def _worker_loop(
+    worker_id: int,
+    generation: int,
+    factory: UseCaseFactory,
+    concurrency: int,
+    inbox,
+    outbox
+) -> None:
+    """
+    Asks the coordinator for work one slot at a time and reports each result.
+    A None task means there is no more work. Messages carry the generation of
+    the process so the coordinator can drop those of a replaced one.
+    """
+    use_case, launcher = factory()
+    running: set[asyncio.Task] = set()
+
+    async def run(task_id: int, request: FlightSearchRequest) -> None:
+        started = time.perf_counter()
+        try:
+            flights = await use_case.execute(request)
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+            outbox.put(('result', worker_id, generation, task_id, [], error, time.perf_counter() - started))
+        else:
+            outbox.put(('result', worker_id, generation, task_id, flights, None, time.perf_counter() - started))
+        outbox.put(('ready', worker_id, generation, 1))
+
+    outbox.put(('ready', worker_id, generation, concurrency))
+    try:
+        while True:
+            message = await asyncio.to_thread(inbox.get)
+            if message is None:
+                break
+            task = asyncio.create_task(run(*message))
+            running.add(task)
+            task.add_done_callback(running.discard)
+        await asyncio.gather(*running)
+    finally:
+        await launcher.close()
+
+
+@dataclass
+class _Worker:
+    worker_id: int
+    process: multiprocessing.Process
+    inbox: multiprocessing.Queue
+    in_flight: dict[int, FlightSearchRequest] = field(default_factory=dict)
+    credit: int = 0
+    restarts: int = 0 # Also the generation its messages are tagged with
+    retired: bool = False # Crashed with no restarts left
+
+
+@dataclass
+class ShardedFlightSearch:
+    """
+    Runs searches in several worker processes, each with its own event loop,
+    Playwright driver and browser pool. Requests are sharded round-robin; a
+    worker with free slots takes from its own shard first and steals from the
+    longest other shard when its own is empty. Crashed workers are restarted
+    and their in-flight requests are re-queued.
+    """
+    config: ProcessPoolConfig
+    logger: Logger
+    factory: UseCaseFactory = container_use_case
+
+    async def run(self, requests: Iterable[FlightSearchRequest]) -> AsyncIterator[SearchOutcome]:
+        context = multiprocessing.get_context('spawn')
+        outbox = context.Queue()
+        worker_count = max(1, self.config.workers)
+        pending = {task_id: request for task_id, request in enumerate(requests)}
+        shards: list[deque[int]] = [deque() for _ in range(worker_count)]
+        for task_id in pending:
+            shards[task_id % worker_count].append(task_id)
+        workers = [self._spawn(context, worker_id, outbox) for worker_id in range(worker_count)]
+
+        try:
+            while pending:
+                for outcome in self._recover_crashed(context, workers, shards, pending, outbox):
+                    yield outcome
+                try:
+                    message = await asyncio.to_thread(outbox.get, True, 0.5)
+                except queue.Empty:
+                    continue
+                kind, worker_id, generation = message[:3]
+                worker = workers[worker_id]
+                if generation != worker.restarts or worker.retired:
+                    # sent by a process that has since crashed; its work was re-queued
+                    continue
+                if kind == 'ready':
+                    worker.credit += message[3]
+                elif kind == 'result':
+                    _, _, _, task_id, flights, error, elapsed = message
+                    request = worker.in_flight.pop(task_id, None)
+                    if request is not None and task_id in pending:
+                        del pending[task_id]
+                        yield SearchOutcome(
+                            request,
+                            flights=flights,
+                            error=RuntimeError(error) if error else None,
+                            elapsed=elapsed,
+                        )
+                self._dispatch(workers, shards, pending)
+        finally:
+            for worker in workers:
+                if worker.process.is_alive():
+                    worker.inbox.put(None)
+            for worker in workers:
+                await asyncio.to_thread(worker.process.join, 30)
+                if worker.process.is_alive():
+                    worker.process.kill()
+
+    def _spawn(self, context, worker_id: int, outbox, restarts: int = 0) -> _Worker:
+        inbox = context.Queue()
+        process = context.Process(
+            target=_worker_main,
+            args=(worker_id, restarts, self.factory, self.config.concurrency_per_worker, inbox, outbox),
+            name=f'flight-search-worker-{worker_id}',
+            daemon=True,
+        )
+        process.start()
+        return _Worker(worker_id, process, inbox, restarts=restarts)
+
+    def _dispatch(self, workers: list[_Worker], shards: list[deque[int]], pending: dict) -> None:
+        for worker in workers:
+            while worker.credit > 0:
+                task_id = self._next_task(worker.worker_id, shards)
+                if task_id is None:
+                    return
+                worker.credit -= 1
+                worker.in_flight[task_id] = pending[task_id]
+                worker.inbox.put((task_id, pending[task_id]))
+
+    def _next_task(self, worker_id: int, shards: list[deque[int]]) -> Optional[int]:
+        if shards[worker_id]:
+            return shards[worker_id].popleft()
+        victim = max(shards, key=len)
+        # steal from the far end so the victim keeps its next task local
+        return victim.pop() if victim else None
+
+    def _recover_crashed(
+        self,
+        context,
+        workers: list[_Worker],
+        shards: list[deque[int]],
+        pending: dict,
+        outbox,
+    ) -> list[SearchOutcome]:
+        failed = []
+        for index, worker in enumerate(workers):
+            if worker.retired or worker.process.is_alive():
+                continue
+            self.logger.error('Worker %s exited with code %s', worker.worker_id, worker.process.exitcode)
+            lost = list(worker.in_flight)
+            if worker.restarts < self.config.max_restarts:
+                shards[worker.worker_id].extendleft(reversed(lost))
+                workers[index] = self._spawn(context, worker.worker_id, outbox, worker.restarts + 1)
+                continue
+            # out of restarts: fail its in-flight work and leave its shard to the others to steal
+            for task_id in lost:
+                failed.append(SearchOutcome(pending.pop(task_id), error=RuntimeError('Worker process crashed')))
+            worker.in_flight.clear()
+            worker.credit = 0
+            worker.retired = True
+            if not any(w.process.is_alive() for w in workers):
+                for task_id in list(pending):
+                    failed.append(SearchOutcome(pending.pop(task_id), error=RuntimeError('No live worker processes')))
+        return failed
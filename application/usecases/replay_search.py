@@ -0,0 +1,50 @@
+import asyncio
+from dataclasses import dataclass, field
+from logging import Logger
+
+from application.usecases.searches_for_flights import FlightSearchUseCase
+from domain.entities.flight import Flight
+from infrastructure.config_browser import InterceptConfig
+from infrastructure.data_parser import flights_from_payload
+from infrastructure.http_replay import ReplayClient
+from infrastructure.schemas.search import FlightSearchRequest
+
+
+@dataclass
+class ReplayStats:
+    replayed: int = 0
+    fallbacks: int = 0
+
+
+@dataclass
+class ReplayFlightSearchUseCase:
+    """
+    Answers searches by replaying the shopping API request over HTTP, and
+    runs the full browser flow instead when the replay is refused or fails.
+    """
+    client: ReplayClient
+    fallback: FlightSearchUseCase
+    intercept: InterceptConfig
+    logger: Logger
+    stats: ReplayStats = field(default_factory=ReplayStats)
+
+    async def execute(self, flight_data: FlightSearchRequest) -> list[Flight]:
+        if not self.client.available:
+            self.stats.fallbacks += 1
+            self.logger.debug('Replay is cooling down after a failed harvest, using the browser')
+            return await self.fallback.execute(flight_data)
+        try:
+            payload = await self.client.fetch(flight_data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.stats.fallbacks += 1
+            self.logger.warning('Replay failed (%s), falling back to the browser', e)
+            return await self.fallback.execute(flight_data)
+        self.stats.replayed += 1
+        return flights_from_payload(
+            payload, self.intercept.currency_symbols, self.intercept.product_types.get(flight_data.cabinType, ())
+        )
+
+    async def close(self) -> None:
+        await self.client.close()
@@ -1,39 +1,238 @@
-from dataclasses import dataclass
+import asyncio
+from dataclasses import dataclass, field
 from datetime import datetime
 from logging import Logger
+import time
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Optional, TypeVar
 
 from domain.entities.flight import Flight
+from infrastructure.browser import CLICK_TIMES_JS
 from infrastructure.browser_service import BrowserService
-from infrastructure.config_browser import SelectorConfig
+from infrastructure.config_browser import DeepLinkConfig, RetryConfig, SelectorConfig
+from infrastructure.data_parser import ResponseCapture
+from infrastructure.deep_link import build_results_url
+from infrastructure.error_handler import ErrorKind, backoff_delay, classify
 from infrastructure.schemas.search import FlightSearchRequest, Passenger
+from infrastructure.structured_logger import correlation_scope
+
+
+_MAX_MONTH_STEPS = 24
+# The site caps passengers at 9 per search, so a counter never needs more single steps
+_MAX_COUNTER_STEPS = 9
+
+T = TypeVar('T')
+
+
+def _months_until(caption: str, month_name: str, year: int) -> Optional[int]:
+    """
+    Number of "next month" clicks from the month shown in the date picker
+    caption to the target month, or None if the target is in the past.
+    """
+    try:
+        shown = datetime.strptime(caption.strip().splitlines()[0].strip(), '%B %Y')
+    except (IndexError, ValueError):
+        return 0
+    target = datetime.strptime(f'{month_name} {year}', '%B %Y')
+    steps = (target.year - shown.year) * 12 + target.month - shown.month
+    return steps if steps >= 0 else None
+
+
+@dataclass
+class SearchOutcome:
+    """
+    The result of one request in a batch: either flights or the error raised.
+    """
+    request: FlightSearchRequest
+    flights: list[Flight] = field(default_factory=list)
+    error: Optional[Exception] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 
 @dataclass
 class FlightSearchUseCase:
     browser_service: BrowserService
     logger: Logger
+    deep_link: DeepLinkConfig = field(default_factory=DeepLinkConfig)
+    retry: RetryConfig = field(default_factory=RetryConfig)
 
     async def execute(self, flight_data: FlightSearchRequest) -> list[Flight]:
-        async with self.browser_service as service:
-            self.logger.info('Executing flight search use case')
+        # every record logged for this search carries the same correlation id
+        with correlation_scope():
+            async with self.browser_service.session() as service:
+                self.logger.info('Executing flight search use case')
+                return await self.search_in_session(service, flight_data)
 
-            # Navigate to the flight search page
-            await service.interactor.navigate(flight_data.url)
-            # 'https://www.united.com/en/gb/fsr/choose-flights?f=LONDON&t=CHICAGO&d=2025-10-22&tt=1&sc=7&px=1,0,0,0,0,1,0,0&taxng=1&newHP=True&clm=7'
-            # Choose flight type
-            await self._check_flight_type(service)
-            
-            # Fill in the search form
-            await self._fill_form(service, flight_data)
+    async def search_in_session(self, service: BrowserService, flight_data: FlightSearchRequest) -> list[Flight]:
+        """
+        Runs one search on an already open session, so callers can submit many
+        searches on the same page.
+        """
+        # Listen for the results API response before anything can trigger it
+        capture = service.parser.capture_results()
+        try:
+            with service.timed('search'):
+                await self._open_results(service, flight_data, capture)
+
+                # Parse the captured response, or the flight cards on the results page
+                with service.timed('parse'):
+                    flights = await self._run_step(service, 'parse', lambda: service.parser.parse_flight_data(capture, flight_data.cabinType))
+        finally:
+            if capture is not None:
+                capture.close()
+
+        self.logger.info('Search completed with %d flights found', len(flights))
+        return flights
+
+    async def execute_stream(
+        self,
+        flight_data: FlightSearchRequest,
+        max_results: Optional[int] = None
+    ) -> AsyncIterator[Flight]:
+        """
+        Like execute, but yields each flight as soon as its card is parsed and
+        keeps loading more results until `max_results` or the end of the list.
+
+        A generator cannot hold a context variable across its yields, so the
+        caller opens the `correlation_scope` and closes the stream with
+        `contextlib.aclosing` in the same task when it stops early.
+        """
+        async with self.browser_service.session() as service:
+            self.logger.info('Executing streaming flight search use case')
+            capture = service.parser.capture_results()
+            try:
+                await self._open_results(service, flight_data, capture)
+                async for flight in service.parser.stream_flight_data(capture, max_results, flight_data.cabinType):
+                    yield flight
+            finally:
+                if capture is not None:
+                    capture.close()
+
+    async def execute_many(
+        self,
+        requests: Iterable[FlightSearchRequest],
+        concurrency: int = 4
+    ) -> AsyncIterator[SearchOutcome]:
+        """
+        Runs the requests concurrently, each in its own browser context, with at
+        most `concurrency` searches in flight. Outcomes are yielded in completion
+        order; a failing request is reported in its outcome and does not cancel
+        the rest of the batch.
+        """
+        pending = iter(requests)
+        outcomes: asyncio.Queue[Optional[SearchOutcome]] = asyncio.Queue()
+
+        async def worker() -> None:
+            try:
+                for request in pending:
+                    await outcomes.put(await self._execute_isolated(request))
+            finally:
+                outcomes.put_nowait(None)
+
+        workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+        running = len(workers)
+        try:
+            while running:
+                outcome = await outcomes.get()
+                if outcome is None:
+                    running -= 1
+                    continue
+                yield outcome
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
 
-            # Submit the search form
-            await service.interactor.click_element(service.selectors.search_button)
+    async def _execute_isolated(self, flight_data: FlightSearchRequest) -> SearchOutcome:
+        started = time.perf_counter()
+        try:
+            flights = await self.execute(flight_data)
+        except Exception as e:
+            self.logger.error('Search %s -> %s failed: %s', flight_data.departure, flight_data.arrival, e)
+            return SearchOutcome(flight_data, error=e, elapsed=time.perf_counter() - started)
+        return SearchOutcome(flight_data, flights=flights, elapsed=time.perf_counter() - started)
 
-            # Parse the flight data from the results page
-            flights = await service.parser.parse_flight_data()
+    async def _open_results(
+        self,
+        service: BrowserService,
+        flight_data: FlightSearchRequest,
+        capture: Optional[ResponseCapture] = None
+    ) -> None:
+        # Jump straight to the results page, or drive the search form
+        if not await self._open_deep_link(service, flight_data, capture):
+            await self._submit_search_form(service, flight_data)
 
-            self.logger.info(f'Search completed with {len(flights)} flights found')
-            return flights
+    async def _open_deep_link(
+        self,
+        service: BrowserService,
+        flight_data: FlightSearchRequest,
+        capture: Optional[ResponseCapture] = None
+    ) -> bool:
+        if not self.deep_link.enabled:
+            return False
+        try:
+            url = build_results_url(flight_data, self.deep_link)
+        except ValueError as e:
+            self.logger.warning('Cannot build a deep link for this search: %s', e)
+            return False
+        with service.timed('deep_link'):
+            try:
+                service.page_loads += 1
+                await service.interactor.navigate(url)
+            except Exception as e:
+                if classify(e) is ErrorKind.BLOCKED:
+                    raise
+                self.logger.warning('Deep link navigation failed, falling back to the search form: %s', e)
+                return False
+            if not await service.parser.wait_for_results(capture, timeout=self.deep_link.render_timeout):
+                self.logger.warning('Deep link did not render results, falling back to the search form')
+                return False
+        return True
+
+    async def _submit_search_form(self, service: BrowserService, flight_data: FlightSearchRequest) -> None:
+        # Navigate to the flight search page, submitting loads the results page
+        service.page_loads += 2
+        with service.timed('navigate'):
+            await self._run_step(service, 'navigate', lambda: service.interactor.navigate(flight_data.url))
+
+        # Choose the flight type and fill in the search form
+        await self._run_step(service, 'form', lambda: self._fill_search_form(service, flight_data))
+
+        # Submit the search form
+        with service.timed('submit'):
+            await self._run_step(service, 'submit', lambda: self._submit(service))
+
+    async def _run_step(self, service: BrowserService, step: str, action: Callable[[], Awaitable[T]]) -> T:
+        """
+        Runs one step of the navigate -> form -> submit -> parse pipeline,
+        retrying it in the same page with backoff while the errors are
+        transient, so earlier steps are not repeated.
+        """
+        attempt = 1
+        while True:
+            try:
+                return await action()
+            except Exception as e:
+                if attempt >= self.retry.max_attempts or classify(e) is not ErrorKind.TRANSIENT:
+                    raise
+                delay = backoff_delay(self.retry, attempt)
+                self.logger.warning(
+                    'Step %s failed (%s), retrying in %.2fs (%s/%s)', step, e, delay, attempt, self.retry.max_attempts - 1
+                )
+                service.retries += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def _submit(self, service: BrowserService) -> None:
+        await service.interactor.click_element(await service.locators.selector('search_button'), name='search_button')
+
+    async def _fill_search_form(self, service: BrowserService, flight_data: FlightSearchRequest) -> None:
+        with service.timed('flight_type'):
+            await self._check_flight_type(service)
+        await self._fill_form(service, flight_data)
 
     async def _check_flight_type(self, service: BrowserService) -> None:
         await service.client.check(service.selectors.flight_type_one)
@@ -44,26 +243,29 @@ class FlightSearchUseCase:
         selectors = service.selectors
 
         # Fill in the departure and arrival fields
-        await service.interactor.fill_input(selectors.from_input, flight_data.departure)
-        await service.interactor.fill_input(selectors.to_input, flight_data.arrival)
-        
-        await service.interactor.click_element('body')
+        with service.timed('fill_route'):
+            await service.interactor.fill_input(selectors.from_input, flight_data.departure, name='from_input')
+            await service.interactor.fill_input(selectors.to_input, flight_data.arrival, name='to_input')
+            await service.interactor.click_element('body', name='body')
 
         # Fill in the date fields
         if not flight_data.departure_date and not flight_data.return_date:
             self.logger.error('No departure or return date provided')
             raise ValueError('Departure or return date must be provided')
-        departure_date = flight_data._formate_date(flight_data.departure_date)
-        await self._fill_date(service, selectors, departure_date)
-        if flight_data.return_date:
-            return_date = flight_data._formate_date(flight_data.return_date)
-            await self._fill_date(service, selectors, return_date)
+        with service.timed('fill_date'):
+            departure_date = flight_data._formate_date(flight_data.departure_date)
+            await self._fill_date(service, selectors, departure_date)
+            if flight_data.return_date:
+                return_date = flight_data._formate_date(flight_data.return_date)
+                await self._fill_date(service, selectors, return_date)
 
         # Select the number of passengers
-        await self._fill_passengers(service, selectors, flight_data.passengers)
+        with service.timed('fill_passengers'):
+            await self._fill_passengers(service, selectors, flight_data.passengers)
 
         # Select the class of service
-        await self._fill_service(service, selectors, flight_data.cabinType)
+        with service.timed('fill_service'):
+            await self._fill_service(service, selectors, flight_data.cabinType)
 
     async def _fill_date(
         self, 
@@ -74,23 +276,36 @@ class FlightSearchUseCase:
         month_name, day, year = date_value
 
         # open the date picker
-        await service.interactor.click_element(selectors.date_input)
-        await service.interactor.wait_for_element(selectors.date_modal)
+        await service.interactor.click_element(selectors.date_input, name='date_input')
+        await service.interactor.wait_for_element(selectors.date_modal, name='date_modal')
 
-        # if you need to click “next month” until you hit the right one:
-        while True:
-            caption = await service.interactor.inner_text(selectors.date_caption)
-            if f'{month_name} {year}' in caption:
+        # work out how many months to page forward from the visible caption
+        target = f'{month_name} {year}'
+        caption = await service.interactor.inner_text(selectors.date_caption, name='date_caption')
+        steps = _months_until(caption, month_name, year)
+        if steps is None:
+            raise ValueError(f'Cannot page back to {target} from {caption.strip()}')
+        if steps:
+            await service.interactor.click_repeatedly(selectors.next_month_btn, steps, name='next_month_btn')
+            caption = await service.interactor.inner_text(selectors.date_caption, name='date_caption')
+
+        # the widget ignored some clicks: fall back to one month at a time
+        for _ in range(_MAX_MONTH_STEPS):
+            if target in caption:
                 break
-            await service.interactor.click_element(selectors.next_month_btn)
+            await service.interactor.click_element(selectors.next_month_btn, name='next_month_btn')
+            caption = await service.interactor.inner_text(selectors.date_caption, name='date_caption')
+        else:
+            raise ValueError(f'Could not reach {target} in the date picker')
 
         # pick the actual day cell
         try:
             day_selector = selectors.day_btn.format(day=day)
-            await service.interactor.click_element(day_selector)
+            await service.interactor.click_element(day_selector, name='day_btn')
         except Exception as e:
-            self.logger.error(f'Error selecting date {day}: {e}')
-            raise ValueError(f'Could not select date {day}')    
+            # re-raised as is, so a timeout is still retried as a transient error
+            self.logger.error('Error selecting date %s: %s', day, e)
+            raise
 
     async def _fill_passengers(
         self, 
@@ -99,32 +314,44 @@ class FlightSearchUseCase:
         passengers: list[Passenger]
     ) -> None:
         # open passengers dialog
-        await service.interactor.click_element(selectors.passengers_field)
-        await self.browser_service.interactor.wait_for_element(selectors.popup_modal)
+        await service.interactor.click_element(selectors.passengers_field, name='passengers_field')
+        await service.interactor.wait_for_element(selectors.popup_modal, name='popup_modal')
 
+        locators = service.locators
         for passenger in passengers:
-            row = await service.interactor.client.query_selector(
-                selectors.passenger_row.format(category_label=passenger.category)
-            )
-            if row is None:
+            label = {'category_label': passenger.category}
+            row = await locators.locator('passenger_row', **label)
+            if not await row.count():
                 raise RuntimeError(f"Passenger row for '{passenger.category}' not found")
             
             # Read the current value
-            input_el  = await row.query_selector(selectors.caption_el)
-            plus_btn  = await row.query_selector(selectors.plus_btn)
-            minus_btn = await row.query_selector(selectors.minus_btn)
+            input_el  = await locators.locator('caption_el', parent='passenger_row', **label)
+            plus_btn  = await locators.locator('plus_btn', parent='passenger_row', **label)
+            minus_btn = await locators.locator('minus_btn', parent='passenger_row', **label)
             
             current = int(await input_el.get_attribute("value"))
-            
-            while current < passenger.count:
-                await plus_btn.click() 
+
+            # set the counter in one in-page action, then check the final value
+            delta = passenger.count - current
+            if delta:
+                button = plus_btn if delta > 0 else minus_btn
+                await button.evaluate(CLICK_TIMES_JS, abs(delta))
                 current = int(await input_el.get_attribute("value"))
-            while current > passenger.count:
-                await minus_btn.click()
+
+            # the widget dropped clicks: step one at a time
+            for _ in range(_MAX_COUNTER_STEPS):
+                if current == passenger.count:
+                    break
+                await (plus_btn if current < passenger.count else minus_btn).click()
                 current = int(await input_el.get_attribute("value"))
+            else:
+                if current != passenger.count:
+                    raise ValueError(
+                        f"Could not set {passenger.category} to {passenger.count}, the counter stays at {current}"
+                    )
 
         # close the dialog (if needed)
-        await self.browser_service.interactor.click_element(selectors.passengers_field)
+        await service.interactor.click_element(selectors.passengers_field, name='passengers_field')
 
     async def _fill_service(
         self,
@@ -133,10 +360,10 @@ class FlightSearchUseCase:
         cabinType: str
     ) -> None:
         if cabinType == 'economy':
-            await self.browser_service.interactor.client.select_option(selectors.class_input, 'Economy')
+            await service.client.select_option(selectors.class_input, 'Economy')
         elif cabinType == 'business':
-            await self.browser_service.interactor.client.select_option(selectors.class_input, 'Premium Economy')
+            await service.client.select_option(selectors.class_input, 'Premium Economy')
         elif cabinType == 'first':
-            await self.browser_service.interactor.client.select_option(selectors.class_input, 'Business or First')
+            await service.client.select_option(selectors.class_input, 'Business or First')
         else:
-            self.logger.warning(f'Unknown class of service: {service}')
+            self.logger.warning('Unknown class of service: %s', service)
@@ -0,0 +1,163 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from logging import Logger
+from typing import Optional
+
+from application.usecases.searches_for_flights import FlightSearchUseCase
+from domain.entities.flight import Flight
+from domain.entities.flight_table import FlightTable
+from infrastructure.config_browser import CacheConfig
+from infrastructure.error_handler import ErrorKind, classify
+from infrastructure.result_cache import ResultCache
+from infrastructure.schemas.search import FlightSearchRequest, SweepRequest
+from infrastructure.structured_logger import correlation_scope
+
+
+@dataclass
+class PriceMatrix:
+    """
+    Cheapest flight per route and date, with the page load accounting of the sweep.
+    A cell is None when its search failed or found nothing.
+    """
+    dates: list[str]
+    cells: dict[tuple[str, str], dict[str, Optional[Flight]]] = field(default_factory=dict)
+    searched: int = 0
+    from_cache: int = 0
+    failed: int = 0
+    attempts: int = 0 # Searches started in a browser, counting retries after a blocked session
+    sessions: int = 0 # Browser sessions the attempts ran in
+    page_loads: int = 0
+
+    @property
+    def saved_sessions(self) -> int:
+        """
+        Sessions saved by re-submitting searches in place instead of opening
+        one session per search.
+        """
+        return self.attempts - self.sessions
+
+    @property
+    def saved_page_loads(self) -> int:
+        """
+        Page loads saved by deep links against the form flow, which loads the
+        homepage and the results page per search.
+        """
+        return 2 * self.attempts - self.page_loads
+
+    def set(self, request: FlightSearchRequest, flights: list[Flight]) -> None:
+        cheapest = FlightTable.from_flights(flights).top(1, by='price')
+        self.cells[(request.departure, request.arrival)][request.departure_date] = cheapest[0] if cheapest else None
+
+    def price(self, route: tuple[str, str], date: str) -> Optional[int]:
+        flight = self.cells.get(route, {}).get(date)
+        return flight.price_minor if flight else None
+
+    def to_dict(self) -> dict:
+        return {
+            'dates': self.dates,
+            'routes': {
+                f'{departure}-{arrival}': {date: flight.price if flight else None for date, flight in row.items()}
+                for (departure, arrival), row in self.cells.items()
+            },
+            'searched': self.searched,
+            'from_cache': self.from_cache,
+            'failed': self.failed,
+            'sessions': self.sessions,
+            'saved_sessions': self.saved_sessions,
+            'page_loads': self.page_loads,
+            'saved_page_loads': self.saved_page_loads,
+        }
+
+
+@dataclass
+class FlightSweepUseCase:
+    """
+    Searches a route x date window by re-submitting searches in place, one
+    browser session per worker, and reuses results that are still cached.
+    """
+    use_case: FlightSearchUseCase
+    cache: ResultCache
+    cache_config: CacheConfig
+    logger: Logger
+    workers: int = 4
+
+    async def execute(self, sweep: SweepRequest) -> PriceMatrix:
+        planned = sweep.plan()
+        matrix = PriceMatrix(sweep.dates())
+        for route in sweep.routes:
+            matrix.cells.setdefault(route, {date: None for date in matrix.dates})
+        pending = []
+        for request in planned:
+            entry = await self.cache.get(request.cache_key()) if self.cache_config.enabled else None
+            if entry is not None and entry.age <= self.cache_config.ttl:
+                matrix.set(request, entry.flights)
+                matrix.from_cache += 1
+            else:
+                pending.append(request)
+        self.logger.info('Sweep planned %d searches, %d served from cache', len(planned), matrix.from_cache)
+
+        queue = deque(pending)
+        await asyncio.gather(*(
+            self._run_worker(queue, matrix) for _ in range(min(self.workers, len(pending)))
+        ))
+        # every worker lost its page or stayed blocked before the queue ran out
+        unsearched = len(queue)
+        if unsearched:
+            self.logger.warning('Sweep left %d searches unsearched after all sessions closed', unsearched)
+            matrix.failed += unsearched
+        self.logger.info(
+            'Sweep finished: %d searched, %d failed, %d sessions (%d saved by reuse), '
+            '%d page loads (%d saved by deep links)',
+            matrix.searched, matrix.failed, matrix.sessions, matrix.saved_sessions,
+            matrix.page_loads, matrix.saved_page_loads
+        )
+        return matrix
+
+    async def _run_worker(self, queue: deque[FlightSearchRequest], matrix: PriceMatrix) -> None:
+        """
+        Works through the queue in one session. A blocked session is closed so
+        its identity gets quarantined, and the worker carries on in a new one,
+        up to `RetryConfig.max_attempts` sessions.
+        """
+        for _ in range(self.use_case.retry.max_attempts):
+            try:
+                await self._run_session(queue, matrix)
+                return
+            except Exception as e:
+                if classify(e) is not ErrorKind.BLOCKED:
+                    raise
+                self.logger.warning('Sweep session blocked (%s), continuing in a new session', e)
+
+    async def _run_session(self, queue: deque[FlightSearchRequest], matrix: PriceMatrix) -> None:
+        async with self.use_case.browser_service.session() as service:
+            matrix.sessions += 1
+            try:
+                while queue:
+                    request = queue.popleft()
+                    matrix.attempts += 1
+                    with correlation_scope():
+                        try:
+                            flights = await self.use_case.search_in_session(service, request)
+                        except Exception as e:
+                            if classify(e) is ErrorKind.BLOCKED:
+                                # the rest of the queue is searched from a session that is not blocked
+                                queue.appendleft(request)
+                                raise
+                            self.logger.error(
+                                'Sweep search %s -> %s on %s failed: %s',
+                                request.departure, request.arrival, request.departure_date, e
+                            )
+                            flights = None
+                    if flights is None:
+                        matrix.failed += 1
+                        if service.client.is_closed():
+                            # the page is gone, leave the rest of the queue to the other workers
+                            break
+                        continue
+                    matrix.searched += 1
+                    matrix.set(request, flights)
+                    if flights and self.cache_config.enabled:
+                        await self.cache.set(request.cache_key(), flights)
+            finally:
+                matrix.page_loads += service.page_loads
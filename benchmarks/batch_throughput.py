@@ -0,0 +1,53 @@
+"""
+Measures FlightSearchUseCase.execute_many throughput (searches/min) at several
+concurrency levels. Runs against the local fixture site unless --url is given.
+
+    python -m benchmarks.batch_throughput --requests 32
+    python -m benchmarks.batch_throughput --url http://127.0.0.1:8765/en/gb
+"""
+import argparse
+import asyncio
+from contextlib import nullcontext
+import json
+import time
+
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.support import build_requests, build_use_case
+from infrastructure.config_browser import BrowserConfig
+
+
+async def measure(url: str, count: int, concurrency: int) -> dict:
+    config = BrowserConfig(pool_max_browsers=2, pool_contexts_per_browser=max(1, -(-concurrency // 2)))
+    use_case, launcher = build_use_case(browser_config=config)
+    failures = 0
+    try:
+        started = time.perf_counter()
+        async for outcome in use_case.execute_many(build_requests(url, count), concurrency=concurrency):
+            failures += not outcome.ok
+        elapsed = time.perf_counter() - started
+    finally:
+        await launcher.close()
+    return {
+        'concurrency': concurrency,
+        'requests': count,
+        'failures': failures,
+        'elapsed_s': round(elapsed, 3),
+        'searches_per_min': round(count / elapsed * 60, 1),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', help='Base URL of a stand-in site; the fixture server is used otherwise')
+    parser.add_argument('--requests', type=int, default=32)
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 4, 16])
+    args = parser.parse_args()
+
+    with (nullcontext() if args.url else FixtureServer()) as server:
+        url = args.url or server.url
+        results = [await measure(url, args.requests, level) for level in args.levels]
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,165 @@
+"""
+An in-process stand-in for united.com: the home search form, the results page
+and the shopping API, served from benchmarks/site on a local port.
+
+    with FixtureServer() as server:
+        request = FlightSearchRequest(url=server.url, ...)
+"""
+from dataclasses import dataclass, field
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import secrets
+import threading
+import time
+from typing import Optional
+from urllib.parse import parse_qsl, urlsplit
+import zlib
+
+from benchmarks.fixtures import generate_flights, render_payload
+
+
+SITE_DIR = os.path.join(os.path.dirname(__file__), 'site')
+HOME_PATH = '/en/gb'
+RESULTS_PATH = '/en/gb/fsr/choose-flights'
+API_PATH = '/api/flight/FetchFlights'
+
+
+@dataclass
+class FixtureServer:
+    host: str = '127.0.0.1'
+    port: int = 0 # 0 picks a free port
+    results_count: int = 60 # Flights returned per search
+    api_delay: float = 0.0 # Seconds the shopping API takes to answer
+    require_token: bool = False # Refuse API calls without the token issued with the results page
+    token_ttl: float = 600.0 # Seconds an issued token is accepted
+    api_requests: int = 0
+    rejected_requests: int = 0 # API calls refused with 401
+    _tokens: dict[str, float] = field(default_factory=dict, init=False)
+    _server: Optional[ThreadingHTTPServer] = field(default=None, init=False)
+    _thread: Optional[threading.Thread] = field(default=None, init=False)
+
+    @property
+    def origin(self) -> str:
+        return f'http://{self.host}:{self._server.server_address[1]}'
+
+    @property
+    def url(self) -> str:
+        """
+        The value to use as FlightSearchRequest.url.
+        """
+        return self.origin + HOME_PATH
+
+    def start(self) -> 'FixtureServer':
+        self._server = ThreadingHTTPServer((self.host, self.port), _handler_for(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fixture-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        self._server = None
+
+    def __enter__(self) -> 'FixtureServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def issue_token(self) -> str:
+        token = secrets.token_hex(16)
+        self._tokens[token] = time.monotonic()
+        return token
+
+    def token_valid(self, header: Optional[str], cookie: Optional[str]) -> bool:
+        """
+        Like the real site, the API wants the token both as a header and as
+        the cookie it was issued in.
+        """
+        issued = self._tokens.get(header or '')
+        return issued is not None and header == cookie and time.monotonic() - issued <= self.token_ttl
+
+    def expire_tokens(self) -> None:
+        """
+        Invalidates every issued token, as a session timeout on the real site would.
+        """
+        self._tokens.clear()
+
+    def payload(self, query: dict[str, str]) -> dict:
+        """
+        Deterministic results for a route and date.
+        """
+        seed = zlib.crc32(f"{query.get('f')}|{query.get('t')}|{query.get('d')}".encode())
+        return render_payload(
+            generate_flights(self.results_count, seed=seed),
+            query.get('d') or '',
+            origin=query.get('f') or '',
+            destination=query.get('t') or '',
+        )
+
+
+def _handler_for(fixture: FixtureServer) -> type:
+    pages = {}
+    for name in ('home', 'results'):
+        with open(os.path.join(SITE_DIR, f'{name}.html'), 'rb') as f:
+            pages[name] = f.read()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self) -> None:
+            path = urlsplit(self.path).path.rstrip('/')
+            if path == HOME_PATH:
+                self._send(200, 'text/html; charset=utf-8', pages['home'])
+            elif path == RESULTS_PATH:
+                cookie = f'api_token={fixture.issue_token()}; Path=/; SameSite=Lax'
+                self._send(200, 'text/html; charset=utf-8', pages['results'], {'Set-Cookie': cookie})
+            elif path == API_PATH:
+                self._api(dict(parse_qsl(urlsplit(self.path).query)))
+            else:
+                self._send(404, 'text/plain', b'not found')
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else b'{}'
+            if urlsplit(self.path).path != API_PATH:
+                self._send(404, 'text/plain', b'not found')
+                return
+            try:
+                query = json.loads(body or b'{}')
+            except ValueError:
+                self._send(400, 'text/plain', b'invalid json')
+                return
+            self._api(query)
+
+        def _api(self, query: dict) -> None:
+            fixture.api_requests += 1
+            if fixture.require_token:
+                cookies = SimpleCookie(self.headers.get('Cookie') or '')
+                cookie = cookies['api_token'].value if 'api_token' in cookies else None
+                if not fixture.token_valid(self.headers.get('X-Api-Token'), cookie):
+                    fixture.rejected_requests += 1
+                    self._send(401, 'application/json', b'{"error": "invalid token"}')
+                    return
+            if fixture.api_delay:
+                time.sleep(fixture.api_delay)
+            self._send(200, 'application/json', json.dumps(fixture.payload(query)).encode())
+
+        def _send(self, status: int, content_type: str, body: bytes, headers: Optional[dict] = None) -> None:
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    return Handler
@@ -0,0 +1,110 @@
+"""
+Renders stand-in pages whose markup matches the default SelectorConfig.
+"""
+from dataclasses import dataclass
+from html import escape
+import random
+
+
+@dataclass
+class FixtureFlight:
+    number: int
+    departure: str
+    arrival: str
+    hours: int
+    minutes: int
+    price: int
+    stops: int
+    aircraft: str = 'Boeing 767-300'
+
+    @property
+    def airline(self) -> str:
+        return f'UA {self.number} ({self.aircraft})'
+
+    @property
+    def duration_label(self) -> str:
+        return f'{self.hours}H, {self.minutes}M' if self.minutes else f'{self.hours}H'
+
+    @property
+    def stop_label(self) -> str:
+        if not self.stops:
+            return 'NONSTOP'
+        return f'{self.stops} STOP' if self.stops == 1 else f'{self.stops} STOPS'
+
+
+def generate_flights(count: int, seed: int = 7) -> list[FixtureFlight]:
+    rng = random.Random(seed)
+    flights = []
+    for index in range(count):
+        start = rng.randrange(5 * 60, 22 * 60, 5)
+        length = rng.randrange(8 * 60, 14 * 60, 5)
+        end = (start + length) % (24 * 60)
+        flights.append(FixtureFlight(
+            number=900 + index,
+            departure=f'{start // 60:02d}:{start % 60:02d}',
+            arrival=f'{end // 60:02d}:{end % 60:02d}',
+            hours=length // 60,
+            minutes=length % 60,
+            price=rng.randrange(450, 2500),
+            stops=rng.choice((0, 0, 0, 1, 2)),
+        ))
+    return flights
+
+
+def render_card(flight: FixtureFlight) -> str:
+    return f'''
+<div class="app-components-Shopping-GridItem-styles__flightRow--QbVXL" data-flight="{flight.number}">
+  <div class="app-components-Shopping-FlightBaseCard-styles__flightHeaderRight--QmZQI">{flight.stop_label}</div>
+  <div class="app-components-Shopping-FlightBaseCard-styles__descriptionStyle--TCjDn">
+    <div><span aria-hidden="true">{escape(flight.airline)}</span></div>
+  </div>
+  <span class="app-components-Shopping-FlightBaseCard-styles__flightBaseCardContainer__time--DRWoI">{flight.departure}</span>
+  <span class="app-components-Shopping-FlightBaseCard-styles__flightBaseCardContainer__time--DRWoI">{flight.arrival}</span>
+  <div class="app-components-Shopping-FlightInfoBlock-styles__dividerText--Gwk7g">
+    <span aria-hidden="true">{flight.duration_label}</span><br>
+    <span>Duration {flight.hours} hours and {flight.minutes} minutes</span>
+  </div>
+  <div class="app-components-Shopping-PriceCard-styles__priceValueNonUS--c6Loz"><span>&pound;{flight.price:,}</span></div>
+</div>'''
+
+
+def render_results_page(flights: list[FixtureFlight]) -> str:
+    cards = ''.join(render_card(flight) for flight in flights)
+    return f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Results</title></head><body>{cards}</body></html>'
+
+
+def render_payload(
+    flights: list[FixtureFlight],
+    date: str,
+    currency: str = 'GBP',
+    origin: str = '',
+    destination: str = ''
+) -> dict:
+    """
+    A shopping API response shaped like data.Trips[].Flights[].
+    """
+    return {
+        'data': {
+            'Trips': [{
+                'Origin': origin,
+                'Destination': destination,
+                'DepartDate': date,
+                'Flights': [
+                    {
+                        'FlightNumber': str(flight.number),
+                        'MarketingCarrier': 'UA',
+                        'DepartDateTime': f'{date} {flight.departure}',
+                        'DestinationDateTime': f'{date} {flight.arrival}',
+                        'TravelMinutesTotal': flight.hours * 60 + flight.minutes,
+                        'EquipmentDisclosures': {'EquipmentDescription': flight.aircraft},
+                        'Connections': [{'FlightNumber': str(flight.number + 1000 + stop)} for stop in range(flight.stops)],
+                        'Products': [
+                            {'ProductType': 'ECONOMY', 'Prices': [{'Amount': float(flight.price), 'Currency': currency}]},
+                            {'ProductType': 'BUSINESS', 'Prices': [{'Amount': float(flight.price * 3), 'Currency': currency}]},
+                        ],
+                    }
+                    for flight in flights
+                ],
+            }],
+        },
+    }
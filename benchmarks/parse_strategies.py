@@ -0,0 +1,68 @@
+"""
+Compares DataParser extraction strategies on a saved results page:
+one query per field versus a single in-page evaluation.
+
+    python -m benchmarks.parse_strategies --cards 60 --rounds 20
+    python -m benchmarks.parse_strategies --page saved_results.html
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from playwright.async_api import async_playwright
+
+from benchmarks.fixtures import generate_flights, render_results_page
+from benchmarks.support import QuietLogger
+from infrastructure.config_browser import InterceptConfig, SelectorConfig
+from infrastructure.data_parser import DataParser
+
+
+async def time_strategy(parser: DataParser, rounds: int) -> dict:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        flights = await parser.parse_flight_data()
+        samples.append(time.perf_counter() - started)
+    median = statistics.median(samples)
+    return {
+        'single_roundtrip': parser.single_roundtrip,
+        'cards': len(flights),
+        'median_ms': round(median * 1000, 2),
+        'cards_per_s': round(len(flights) / median, 1) if median else None,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--page', help='Saved results page HTML; a generated fixture is used otherwise')
+    parser.add_argument('--cards', type=int, default=60)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--browser', default='firefox')
+    args = parser.parse_args()
+
+    if args.page:
+        with open(args.page, encoding='utf-8') as f:
+            html = f.read()
+    else:
+        html = render_results_page(generate_flights(args.cards))
+
+    async with async_playwright() as playwright:
+        browser = await getattr(playwright, args.browser).launch()
+        page = await browser.new_page()
+        await page.set_content(html)
+        selectors = SelectorConfig()
+        intercept = InterceptConfig(enabled=False)
+        results = [
+            await time_strategy(
+                DataParser(page, selectors, QuietLogger(), single_roundtrip=mode, intercept=intercept), args.rounds
+            )
+            for mode in (False, True)
+        ]
+        await browser.close()
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
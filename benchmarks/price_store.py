@@ -0,0 +1,94 @@
+"""
+Fills a price store with synthetic scrapes and measures bulk insert rate and
+the latency of the cheapest-flights and price-history queries.
+
+    python -m benchmarks.price_store --rows 1000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.fixtures import FixtureFlight, generate_flights
+from domain.entities.flight import Flight
+from infrastructure.price_store import PriceStore, flight_key
+from infrastructure.schemas.search import FlightSearchRequest
+
+
+def _to_flight(fixture: FixtureFlight) -> Flight:
+    return Flight(
+        airline=fixture.airline,
+        arrival=fixture.arrival,
+        departure=fixture.departure,
+        duration=fixture.duration_label,
+        price=f'£{fixture.price:,}',
+        stop=fixture.stop_label,
+    ).parse()
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    samples = sorted(samples)
+    return {
+        'p50_ms': round(statistics.median(samples) * 1000, 3),
+        'p99_ms': round(samples[int(len(samples) * 0.99) - 1] * 1000, 3),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000, help='History rows to write')
+    parser.add_argument('--flights', type=int, default=40, help='Flights per search')
+    parser.add_argument('--queries', type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    routes = [(f'city{index}', f'city{index + 1}') for index in range(100)]
+    dates = [f'2026-{month:02d}-{day:02d}' for month in range(1, 13) for day in (1, 8, 15, 22)]
+    requests = [
+        FlightSearchRequest(url='', departure=origin, arrival=destination, departure_date=day, passengers=[])
+        for origin, destination in routes for day in dates
+    ]
+    flights = [
+        (request, [_to_flight(flight) for flight in generate_flights(args.flights, seed=index)])
+        for index, request in enumerate(requests)
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = PriceStore(os.path.join(directory, 'prices.sqlite3'))
+        written, scrapes, started = 0, 0, time.perf_counter()
+        while written < args.rows:
+            # every scrape re-prices a share of the flights, the rest must be skipped as unchanged
+            for _, results in flights:
+                for flight in rng.sample(results, len(results) // 4):
+                    flight.price_minor = (flight.price_minor or 0) + rng.choice((-500, 500))
+            for offset in range(0, len(flights), 200):
+                written += await store.record_many(flights[offset:offset + 200])
+            scrapes += 1
+        insert_seconds = time.perf_counter() - started
+
+        cheapest, history = [], []
+        for _ in range(args.queries):
+            request, results = rng.choice(flights)
+            started = time.perf_counter()
+            await store.cheapest(request.departure, request.arrival, request.departure_date, limit=10)
+            cheapest.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            await store.history(request.departure, request.arrival, request.departure_date, flight_key(rng.choice(results)))
+            history.append(time.perf_counter() - started)
+        store.close()
+
+    print(json.dumps({
+        'history_rows': written,
+        'scrapes': scrapes,
+        'rows_per_second': round(written / insert_seconds),
+        'cheapest': _percentiles(cheapest),
+        'history': _percentiles(history),
+    }, indent=4))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
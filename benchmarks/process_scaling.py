@@ -0,0 +1,53 @@
+"""
+Measures ShardedFlightSearch throughput against the fixture site for several
+worker process counts, to check that throughput scales with cores.
+
+    python -m benchmarks.process_scaling --requests 64 --workers 1 2 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from application.usecases.process_pool import ShardedFlightSearch
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.support import QuietLogger, build_requests, build_use_case
+from infrastructure.config_browser import ProcessPoolConfig
+
+
+async def measure(url: str, count: int, workers: int, concurrency: int) -> dict:
+    pool = ShardedFlightSearch(
+        ProcessPoolConfig(workers=workers, concurrency_per_worker=concurrency), QuietLogger(), build_use_case
+    )
+    failures = 0
+    started = time.perf_counter()
+    async for outcome in pool.run(build_requests(url, count)):
+        failures += not outcome.ok
+    elapsed = time.perf_counter() - started
+    return {
+        'workers': workers,
+        'concurrency_per_worker': concurrency,
+        'requests': count,
+        'failures': failures,
+        'searches_per_min': round(count / elapsed * 60, 1),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=64)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--concurrency', type=int, default=4, help='Searches in flight per worker')
+    args = parser.parse_args()
+
+    with FixtureServer() as server:
+        results = [await measure(server.url, args.requests, workers, args.concurrency) for workers in args.workers]
+    baseline = results[0]['searches_per_min'] / results[0]['workers']
+    for result in results:
+        result['scaling_efficiency'] = round(result['searches_per_min'] / (baseline * result['workers']), 2)
+    print(json.dumps({'cpus': os.cpu_count(), 'results': results}, indent=4))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
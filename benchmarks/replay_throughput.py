@@ -0,0 +1,84 @@
+"""
+Compares searches/min of the full browser flow with browserless HTTP replay
+against the fixture site, whose API requires the token issued with the
+results page. Halfway through the replay run every token is expired, so the
+fallback to the browser and the re-harvest are exercised too.
+
+    python -m benchmarks.replay_throughput --requests 200
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from application.usecases.replay_search import ReplayFlightSearchUseCase
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.support import QuietLogger, build_requests, build_use_case
+from infrastructure.config_browser import DeepLinkConfig, InterceptConfig, ReplayConfig
+from infrastructure.http_replay import ReplayClient, TokenHarvester
+
+
+async def browser_run(url: str, count: int, concurrency: int) -> dict:
+    use_case, launcher = build_use_case()
+    failures = 0
+    try:
+        started = time.perf_counter()
+        async for outcome in use_case.execute_many(build_requests(url, count), concurrency=concurrency):
+            failures += not outcome.ok
+        elapsed = time.perf_counter() - started
+    finally:
+        await launcher.close()
+    return {'mode': 'browser', 'requests': count, 'failures': failures, 'searches_per_min': round(count / elapsed * 60, 1)}
+
+
+async def replay_run(server: FixtureServer, count: int, concurrency: int) -> dict:
+    fallback, launcher = build_use_case()
+    logger = QuietLogger()
+    config, deep_link, intercept = ReplayConfig(enabled=True, max_in_flight=concurrency), DeepLinkConfig(), InterceptConfig()
+    client = ReplayClient(launcher, TokenHarvester(launcher, deep_link, intercept, config, logger), deep_link, config, logger)
+    replay = ReplayFlightSearchUseCase(client, fallback, intercept, logger)
+    requests = build_requests(server.url, count)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def search(request) -> None:
+        async with semaphore:
+            await replay.execute(request)
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(search(request) for request in requests[:count // 2]))
+        server.expire_tokens()
+        await asyncio.gather(*(search(request) for request in requests[count // 2:]))
+        elapsed = time.perf_counter() - started
+    finally:
+        await replay.close()
+        await launcher.close()
+    return {
+        'mode': 'replay',
+        'requests': count,
+        'replayed': replay.stats.replayed,
+        'fallbacks': replay.stats.fallbacks,
+        'harvests': client.harvests,
+        'searches_per_min': round(count / elapsed * 60, 1),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--browser-requests', type=int, default=16, help='Requests for the slower browser baseline')
+    parser.add_argument('--concurrency', type=int, default=4)
+    args = parser.parse_args()
+
+    with FixtureServer(require_token=True) as server:
+        browser = await browser_run(server.url, args.browser_requests, args.concurrency)
+        replay = await replay_run(server, args.requests, args.concurrency)
+    print(json.dumps({
+        'browser': browser,
+        'replay': replay,
+        'speedup': round(replay['searches_per_min'] / browser['searches_per_min'], 1),
+    }, indent=4))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,190 @@
+"""
+Offline benchmark suite against the local fixture site. Measures cold and warm
+end-to-end latency (deep link and form flow), parse throughput, peak RSS and
+searches/min at several concurrency levels, and writes the results as JSON.
+With --baseline, exits non-zero when a metric regressed beyond --tolerance.
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --output new.json --baseline bench.json
+"""
+import argparse
+import asyncio
+from contextlib import asynccontextmanager
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import AsyncIterator, Optional
+
+from benchmarks.fixture_server import FixtureServer, RESULTS_PATH
+from benchmarks.support import QuietLogger, build_requests, build_use_case, process_tree_rss
+from infrastructure.config_browser import BrowserConfig, InterceptConfig, SelectorConfig
+from infrastructure.data_parser import DataParser
+
+
+# Direction of each metric, used when comparing against a baseline
+LOWER_IS_BETTER = ('cold_s', 'warm_median_s', 'warm_p95_s', 'form_median_s', 'peak_rss_mb', 'rss_per_session_mb')
+HIGHER_IS_BETTER = ('cards_per_s', 'searches_per_min')
+
+
+def _percentile(samples: list[float], share: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(share * (len(ordered) - 1))))]
+
+
+@asynccontextmanager
+async def _rss_sampler(interval: float = 0.2) -> AsyncIterator[dict]:
+    peak = {'bytes': process_tree_rss()}
+
+    async def sample() -> None:
+        while True:
+            peak['bytes'] = max(peak['bytes'], process_tree_rss())
+            await asyncio.sleep(interval)
+
+    task = asyncio.create_task(sample())
+    try:
+        yield peak
+    finally:
+        task.cancel()
+
+
+async def bench_latency(server: FixtureServer, rounds: int, deep_link: bool) -> dict:
+    use_case, launcher = build_use_case(deep_link=deep_link)
+    requests = build_requests(server.url, rounds + 1)
+    try:
+        started = time.perf_counter()
+        await use_case.execute(requests[0])
+        cold = time.perf_counter() - started
+        samples = []
+        for request in requests[1:]:
+            started = time.perf_counter()
+            await use_case.execute(request)
+            samples.append(time.perf_counter() - started)
+    finally:
+        await launcher.close()
+    if not deep_link:
+        return {'form_median_s': round(statistics.median(samples), 4)}
+    return {
+        'cold_s': round(cold, 4),
+        'warm_median_s': round(statistics.median(samples), 4),
+        'warm_p95_s': round(_percentile(samples, 0.95), 4),
+    }
+
+
+async def bench_parse(server: FixtureServer, rounds: int) -> dict:
+    use_case, launcher = build_use_case()
+    results = {}
+    try:
+        async with use_case.browser_service.session() as service:
+            await service.client.goto(f'{server.origin}{RESULTS_PATH}?f=LONDON&t=CHICAGO&d=2030-01-01')
+            await service.client.wait_for_selector(SelectorConfig().result_items)
+            for single_roundtrip in (False, True):
+                parser = DataParser(
+                    service.client, SelectorConfig(), QuietLogger(),
+                    single_roundtrip=single_roundtrip, intercept=InterceptConfig(enabled=False),
+                )
+                samples, cards = [], 0
+                for _ in range(rounds):
+                    started = time.perf_counter()
+                    cards = len(await parser.parse_flight_data())
+                    samples.append(time.perf_counter() - started)
+                key = 'single_roundtrip' if single_roundtrip else 'per_element'
+                results[key] = {'cards': cards, 'cards_per_s': round(cards / statistics.median(samples), 1)}
+    finally:
+        await launcher.close()
+    return results
+
+
+async def bench_throughput(server: FixtureServer, requests: int, concurrency: int) -> dict:
+    config = BrowserConfig(pool_max_browsers=2, pool_contexts_per_browser=max(1, -(-concurrency // 2)))
+    use_case, launcher = build_use_case(browser_config=config)
+    failures = 0
+    try:
+        async with _rss_sampler() as peak:
+            started = time.perf_counter()
+            async for outcome in use_case.execute_many(build_requests(server.url, requests), concurrency=concurrency):
+                failures += not outcome.ok
+            elapsed = time.perf_counter() - started
+    finally:
+        await launcher.close()
+    peak_mb = peak['bytes'] / 2 ** 20
+    return {
+        'concurrency': concurrency,
+        'requests': requests,
+        'failures': failures,
+        'searches_per_min': round(requests / elapsed * 60, 1),
+        'peak_rss_mb': round(peak_mb, 1),
+        'rss_per_session_mb': round(peak_mb / concurrency, 1),
+    }
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list[str]:
+    """
+    Lists metrics that got worse than the baseline by more than `tolerance`.
+    """
+    regressions = []
+
+    def walk(old: object, new: object, path: str) -> None:
+        if isinstance(old, dict) and isinstance(new, dict):
+            for key in old.keys() & new.keys():
+                walk(old[key], new[key], f'{path}.{key}' if path else key)
+        elif isinstance(old, list) and isinstance(new, list):
+            for index, (old_item, new_item) in enumerate(zip(old, new)):
+                walk(old_item, new_item, f'{path}[{index}]')
+        elif isinstance(old, (int, float)) and isinstance(new, (int, float)) and old:
+            metric = path.rsplit('.', 1)[-1]
+            change = (new - old) / old
+            if metric in LOWER_IS_BETTER and change > tolerance:
+                regressions.append(f'{path}: {old} -> {new} (+{change:.0%})')
+            elif metric in HIGHER_IS_BETTER and change < -tolerance:
+                regressions.append(f'{path}: {old} -> {new} ({change:.0%})')
+
+    walk(baseline.get('results', {}), current.get('results', {}), '')
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> dict:
+    with FixtureServer(results_count=args.cards) as server:
+        results = {}
+        results['latency'] = await bench_latency(server, args.rounds, deep_link=True)
+        results['latency'].update(await bench_latency(server, args.rounds, deep_link=False))
+        results['parse'] = await bench_parse(server, args.rounds)
+        results['throughput'] = [
+            await bench_throughput(server, args.requests, level) for level in args.levels
+        ]
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', help='Earlier results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='Allowed relative regression')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--cards', type=int, default=60)
+    parser.add_argument('--requests', type=int, default=32)
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 4, 16])
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4)
+    print(json.dumps(report['results'], indent=4))
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(json.load(f), report, args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
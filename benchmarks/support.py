@@ -0,0 +1,101 @@
+"""
+Builds the search stack by hand for benchmarks, so each run controls its own
+configuration instead of sharing the application container.
+"""
+from datetime import date, timedelta
+import os
+from typing import Optional
+
+from application.usecases.searches_for_flights import FlightSearchUseCase
+from infrastructure.browser import BrowserManager
+from infrastructure.browser_service import BrowserService
+from infrastructure.config_browser import BrowserConfig, DeepLinkConfig, InterceptConfig, SelectorConfig
+from infrastructure.error_handler import ConsoleLogger
+from infrastructure.metrics import NullTracer, Tracer
+from infrastructure.pacing import NoDelayPacer, Pacer
+from infrastructure.schemas.search import FlightSearchRequest, Passenger
+
+
+class QuietLogger(ConsoleLogger):
+    """
+    Prints errors only, so logging does not dominate the timings.
+    """
+    def debug(self, message: str, *args) -> None:
+        pass
+
+    def info(self, message: str, *args) -> None:
+        pass
+
+    def warning(self, message: str, *args) -> None:
+        pass
+
+
+def build_use_case(
+    browser_config: Optional[BrowserConfig] = None,
+    deep_link: bool = True,
+    intercept: bool = True,
+    pacer: Optional[Pacer] = None,
+    tracer: Optional[Tracer] = None,
+) -> tuple[FlightSearchUseCase, BrowserManager]:
+    logger = QuietLogger()
+    launcher = BrowserManager(browser_config or BrowserConfig(), logger)
+    service = BrowserService(
+        launcher=launcher,
+        logger=logger,
+        selector_config=SelectorConfig(),
+        intercept_config=InterceptConfig(enabled=intercept),
+        pacer=pacer or NoDelayPacer(),
+        tracer=tracer or NullTracer(),
+    )
+    return FlightSearchUseCase(service, logger, deep_link=DeepLinkConfig(enabled=deep_link)), launcher
+
+
+def build_requests(url: str, count: int) -> list[FlightSearchRequest]:
+    """
+    Distinct one-way searches on dates a few weeks ahead, so the fixture date
+    picker always has to page forward.
+    """
+    start = date.today() + timedelta(days=30)
+    return [
+        FlightSearchRequest(
+            url=url,
+            departure='London',
+            arrival='Chicago',
+            departure_date=(start + timedelta(days=index % 60)).isoformat(),
+            passengers=[Passenger(category='Adults', count=1), Passenger(category='Children', count=index % 2)],
+        )
+        for index in range(count)
+    ]
+
+
+def process_tree_rss() -> int:
+    """
+    Resident memory in bytes of this process and all its descendants (the
+    Playwright driver and browsers). Linux only; returns 0 elsewhere.
+    """
+    if not os.path.isdir('/proc'):
+        return 0
+    children: dict[int, list[int]] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # the command name may contain spaces, the fields after it do not
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    total, stack = 0, [os.getpid()]
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+    return total
@@ -1,15 +1,72 @@
 from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+import re
+from typing import Optional
 
 
-@dataclass
+_CURRENCY_SYMBOLS = {'£': 'GBP', '$': 'USD', '€': 'EUR', '¥': 'JPY'}
+_PRICE = re.compile(r'(?P<code>[A-Z]{3})?\s*(?P<symbol>[^\d\s.,A-Z]?)\s*(?P<amount>\d[\d,]*(?:\.\d+)?)')
+_HOURS = re.compile(r'(\d+)\s*H', re.IGNORECASE)
+_MINUTES = re.compile(r'(\d+)\s*M\b', re.IGNORECASE)
+_TIME = re.compile(r'(\d{1,2}):(\d{2})\s*([AP]M)?', re.IGNORECASE)
+_STOPS = re.compile(r'(\d+)\s*STOP', re.IGNORECASE)
+
+
+def _parse_minutes_of_day(value: Optional[str]) -> Optional[int]:
+    match = _TIME.search(value or '')
+    if match is None:
+        return None
+    hours, minutes, meridiem = int(match[1]), int(match[2]), (match[3] or '').upper()
+    if meridiem:
+        hours = hours % 12 + (12 if meridiem == 'PM' else 0)
+    return hours * 60 + minutes
+
+
+@dataclass(slots=True)
 class Flight:
-    airline: str
-    arrival: str
-    departure: str
-    duration: str
-    price: str
-    stop: str
-    
+    airline: Optional[str]
+    arrival: Optional[str]
+    departure: Optional[str]
+    duration: Optional[str]
+    price: Optional[str]
+    stop: Optional[str]
+    # Typed values filled in by parse()
+    price_minor: Optional[int] = None # Price in minor currency units, e.g. pence
+    currency: Optional[str] = None # ISO 4217 code
+    duration_minutes: Optional[int] = None
+    departure_minutes: Optional[int] = None # Minutes after local midnight
+    arrival_minutes: Optional[int] = None # Minutes after local midnight
+    stops: Optional[int] = None
+
+    def parse(self) -> 'Flight':
+        """
+        Fills the typed fields from the raw strings, e.g. "£1,334" becomes
+        price_minor=133400, currency="GBP". Unparseable values stay None.
+        """
+        match = _PRICE.search(self.price or '')
+        if match is not None:
+            try:
+                self.price_minor = int(Decimal(match['amount'].replace(',', '')) * 100)
+            except InvalidOperation:
+                self.price_minor = None
+            self.currency = match['code'] or _CURRENCY_SYMBOLS.get(match['symbol'])
+
+        # only the first line, the rest repeats it for screen readers
+        label = (self.duration or '').split('\n')[0]
+        hours, minutes = _HOURS.search(label), _MINUTES.search(label)
+        if hours or minutes:
+            self.duration_minutes = int(hours[1] if hours else 0) * 60 + int(minutes[1] if minutes else 0)
+
+        self.departure_minutes = _parse_minutes_of_day(self.departure)
+        self.arrival_minutes = _parse_minutes_of_day(self.arrival)
+
+        stop = (self.stop or '').upper()
+        if 'NONSTOP' in stop:
+            self.stops = 0
+        elif (stops := _STOPS.search(stop)) is not None:
+            self.stops = int(stops[1])
+        return self
+
     def to_dict(self):
         return {
             'airline': self.airline,
@@ -17,4 +74,4 @@ class Flight:
             'duration': self.duration,
             'price': self.price,
             'stop': self.stop
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,139 @@
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional, Sequence
+
+from domain.entities.flight import Flight
+
+try:
+    import numpy as np
+except ImportError: # numpy is optional, plain arrays are used without it
+    np = None
+
+
+# Stored in place of missing values so they sort after every real one
+MISSING = 2 ** 62
+
+COLUMNS = ('price_minor', 'duration_minutes', 'departure_minutes', 'arrival_minutes', 'stops')
+_ALIASES = {'price': 'price_minor', 'duration': 'duration_minutes', 'departure': 'departure_minutes', 'arrival': 'arrival_minutes'}
+
+
+def _column_name(name: str) -> str:
+    column = _ALIASES.get(name, name)
+    if column not in COLUMNS:
+        raise ValueError(f'Unknown column: {name}')
+    return column
+
+
+@dataclass
+class FlightTable:
+    """
+    Column-oriented view over many parsed flights for ranking and filtering.
+    Columns are NumPy int64 arrays when NumPy is installed and `array('q')`
+    otherwise; rows keep a reference to the original Flight.
+    """
+    flights: list[Flight] = field(default_factory=list)
+    columns: dict[str, Any] = field(default_factory=dict)
+    currencies: list[Optional[str]] = field(default_factory=list)
+
+    @classmethod
+    def from_flights(cls, flights: Iterable[Flight]) -> 'FlightTable':
+        rows = list(flights)
+        for flight in rows:
+            if flight.price_minor is None and flight.price is not None:
+                flight.parse()
+        columns = {
+            name: array('q', (MISSING if value is None else value for value in (getattr(f, name) for f in rows)))
+            for name in COLUMNS
+        }
+        if np is not None:
+            columns = {name: np.frombuffer(column, dtype=np.int64).copy() for name, column in columns.items()}
+        return cls(rows, columns, [flight.currency for flight in rows])
+
+    def __len__(self) -> int:
+        return len(self.flights)
+
+    def column(self, name: str) -> Sequence[int]:
+        return self.columns[_column_name(name)]
+
+    def take(self, indices: Sequence[int]) -> 'FlightTable':
+        if np is not None:
+            indices = np.asarray(indices, dtype=np.int64)
+            columns = {name: column[indices] for name, column in self.columns.items()}
+        else:
+            columns = {name: array('q', (column[i] for i in indices)) for name, column in self.columns.items()}
+        return FlightTable(
+            [self.flights[i] for i in indices],
+            columns,
+            [self.currencies[i] for i in indices],
+        )
+
+    def sort_by(self, name: str, descending: bool = False) -> 'FlightTable':
+        """
+        Stable sort on one column; missing values always come last.
+        """
+        column = self.column(name)
+        if np is not None:
+            keys = -column if descending else column
+            keys = np.where(column == MISSING, MISSING, keys)
+            return self.take(np.argsort(keys, kind='stable'))
+        order = sorted(
+            range(len(self)),
+            key=lambda i: (column[i] == MISSING, -column[i] if descending else column[i]),
+        )
+        return self.take(order)
+
+    def filter(
+        self,
+        max_price: Optional[int] = None,
+        max_duration: Optional[int] = None,
+        max_stops: Optional[int] = None,
+        departure_after: Optional[int] = None,
+        departure_before: Optional[int] = None,
+        currency: Optional[str] = None,
+    ) -> 'FlightTable':
+        """
+        Keeps rows within every given bound. Prices are in minor units, durations
+        in minutes and departure bounds in minutes after midnight. Rows missing a
+        bounded value are dropped.
+        """
+        bounds = [
+            ('price_minor', None, max_price),
+            ('duration_minutes', None, max_duration),
+            ('stops', None, max_stops),
+            ('departure_minutes', departure_after, departure_before),
+        ]
+        if np is not None:
+            mask = np.ones(len(self), dtype=bool)
+            for name, low, high in bounds:
+                column = self.columns[name]
+                if low is not None:
+                    mask &= (column >= low) & (column != MISSING)
+                if high is not None:
+                    mask &= column <= high
+            if currency is not None:
+                mask &= np.array([value == currency for value in self.currencies], dtype=bool)
+            return self.take(np.flatnonzero(mask))
+        indices = [
+            i for i in range(len(self))
+            if (currency is None or self.currencies[i] == currency)
+            and all(
+                (low is None or low <= self.columns[name][i] != MISSING)
+                and (high is None or self.columns[name][i] <= high)
+                for name, low, high in bounds
+            )
+        ]
+        return self.take(indices)
+
+    def top(self, n: int, by: str = 'price') -> list[Flight]:
+        """
+        The n flights with the lowest value in the column, e.g. cheapest or shortest.
+        """
+        column = self.column(by)
+        if np is not None and n < len(self):
+            candidates = np.argpartition(column, n)[:n]
+            candidates = candidates[np.argsort(column[candidates], kind='stable')]
+            return [self.flights[i] for i in candidates]
+        return self.sort_by(by).flights[:n]
+
+    def to_dicts(self) -> list[dict]:
+        return [flight.to_dict() for flight in self.flights]
@@ -1,25 +1,53 @@
 from abc import ABC, abstractmethod
-from typing import Any, Protocol
+from dataclasses import dataclass, field
+from typing import Any, Optional, Protocol
 
 
 class BrowserClient(Protocol):
     """
     A protocol for browser clients.
     """
-    async def goto(self, url: str) -> None: ...
+    async def goto(self, url: str) -> Any: ...
     async def fill(self, selector) -> None: ...
     async def click(self) -> None: ...
-    async def wait_for_selector(self, selector: str) -> None: ...
+    async def wait_for_selector(self, selector: str, timeout: Optional[float] = None) -> None: ...
     async def query_selector_all(self, selector: str) -> list[Any]: ...
     async def query_selector(self, selector: str) -> None: ...
     async def inner_text(self, selector: str) -> str: ...
+    async def evaluate(self, expression: str, arg: Any = None) -> Any: ...
+    async def wait_for_function(self, expression: str, arg: Any = None, timeout: Optional[float] = None) -> Any: ...
+    def on(self, event: str, handler: Any) -> None: ...
+    def remove_listener(self, event: str, handler: Any) -> None: ...
+    async def eval_on_selector(self, selector: str, expression: str, arg: Any = None) -> Any: ...
+    async def eval_on_selector_all(self, selector: str, expression: str, arg: Any = None) -> Any: ...
+    def locator(self, selector: str) -> Any: ...
+    async def add_locator_handler(self, locator: Any, handler: Any) -> None: ...
+    async def remove_locator_handler(self, locator: Any) -> None: ...
+    async def screenshot(self, type: str = 'png', quality: Optional[int] = None) -> bytes: ...
+    async def content(self) -> str: ...
     @property
     def url(self) -> str: ...
 
 
 class Logger(Protocol):
-    def info(self, message: str) -> None: ...
-    def error(self, message: str) -> None: ...
+    def debug(self, message: str, *args: Any) -> None: ...
+    def info(self, message: str, *args: Any) -> None: ...
+    def warning(self, message: str, *args: Any) -> None: ...
+    def error(self, message: str, *args: Any) -> None: ...
+
+
+@dataclass
+class BrowserLease:
+    """
+    A browser context and page handed out by a launcher for one search.
+    """
+    context: Any
+    page: BrowserClient
+    owner: Optional[Any] = field(default=None, repr=False)
+    traffic: Optional[Any] = None # TrafficMonitor counting this lease's requests
+    identity: Optional[Any] = None # SessionStore identity whose state the context was created with
+    warm: bool = False # Started from saved session state or a recycled context
+    started_at: float = 0.0 # Monotonic time the lease was handed out
 
 
 class BrowserLauncher(ABC):
@@ -27,7 +55,16 @@ class BrowserLauncher(ABC):
     An abstract base class for browser launchers.
     """
     @abstractmethod
-    async def launch(self) -> BrowserClient: ...
-    
+    async def launch(self) -> BrowserLease: ...
+
+    @abstractmethod
+    async def release(self, lease: BrowserLease, discard: bool = False) -> None: ...
+
+    async def quarantine(self, lease: BrowserLease) -> None:
+        """
+        Keeps whatever got the lease blocked out of future leases. The lease
+        must still be released.
+        """
+
     @abstractmethod
-    async def close(self) -> None: ...
\ No newline at end of file
+    async def close(self) -> None: ...
@@ -1,34 +1,215 @@
-from dataclasses import dataclass, field
+import asyncio
+from dataclasses import dataclass, field, replace
 from logging import Logger
-import random
+import re
+import time
 from typing import Any, Optional
-from playwright.async_api import async_playwright, Playwright, Page, BrowserContext
+from playwright.async_api import async_playwright, APIRequestContext, Playwright, Page, BrowserContext
 
-from infrastructure.base_browser import BrowserClient, BrowserLauncher
+from infrastructure.base_browser import BrowserClient, BrowserLauncher, BrowserLease
 from infrastructure.config_browser import BrowserConfig
+from infrastructure.error_handler import BlockedError
+from infrastructure.metrics import NullTracer, Tracer
+from infrastructure.pacing import HumanPacer, Pacer
+from infrastructure.session_store import SessionStore
+from infrastructure.traffic import TrafficMonitor
+
+
+# Clicks an element several times inside the page in one roundtrip
+CLICK_TIMES_JS = '(el, times) => { for (let i = 0; i < times; i++) el.click(); }'
+
+
+@dataclass
+class _PooledBrowser:
+    """
+    A long-lived browser process owned by the BrowserManager pool.
+    """
+    browser: Any
+    uses: int = 0
+    leased: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    retiring: bool = False
+    idle_contexts: list[BrowserLease] = field(default_factory=list)
+
+    @property
+    def healthy(self) -> bool:
+        return not self.retiring and self.browser.is_connected()
 
 
 @dataclass
 class BrowserManager(BrowserLauncher):
     """
-    A concrete implementation of BrowserLauncher that manages browser instances.
+    A concrete implementation of BrowserLauncher that keeps a pool of warm
+    browser processes and hands out one context/page lease per search.
     """
     config: BrowserConfig
     logger: Logger
+    sessions: Optional[SessionStore] = None # Restores cookies and localStorage into new contexts
     _playwright: Optional[Any] = field(default=None, init=False)
-    _browser: Optional[Any] = field(default=None, init=False)
-
-    async def launch(self) -> tuple[BrowserContext, BrowserClient]:
-        playwright = await async_playwright().start()
-        browser = await self._launch_browser(playwright)
-        context = await browser.new_context(
-            user_agent=self.config.user_agent,
-            extra_http_headers=self.config.custom_headers,
-        )
+    _browsers: list[_PooledBrowser] = field(default_factory=list, init=False)
+    _condition: asyncio.Condition = field(default_factory=asyncio.Condition, init=False)
+
+    async def launch(self) -> BrowserLease:
+        pooled = await self._acquire_browser()
+        try:
+            lease = await self._open_page(pooled)
+        except Exception:
+            pooled.retiring = True
+            await self._return_browser(pooled)
+            raise
+        lease.started_at = time.monotonic()
+        return lease
+
+    async def release(self, lease: BrowserLease, discard: bool = False) -> None:
+        pooled: _PooledBrowser = lease.owner
+        page = lease.page
+        if page.is_closed() or not pooled.browser.is_connected():
+            pooled.retiring = True
+            discard = True
+        if not discard and self.sessions and lease.identity:
+            await self._save_session(lease)
+        if not discard and self.config.pool_reuse_contexts and pooled.healthy:
+            try:
+                await page.goto('about:blank')
+                pooled.idle_contexts.append(lease)
+            except Exception as e:
+                self.logger.warning("Could not recycle browser context: %s", e)
+                discard = True
+        else:
+            discard = True
+        if discard:
+            await self._close_quietly(lease.context)
+        await self._return_browser(pooled)
+
+    async def _acquire_browser(self) -> _PooledBrowser:
+        async with self._condition:
+            while True:
+                await self._evict_idle()
+                pooled = self._pick_browser()
+                if pooled is None and len(self._browsers) < self.config.pool_max_browsers:
+                    pooled = await self._start_browser()
+                if pooled is not None:
+                    pooled.leased += 1
+                    pooled.uses += 1
+                    return pooled
+                await self._condition.wait()
+
+    async def _return_browser(self, pooled: _PooledBrowser) -> None:
+        async with self._condition:
+            pooled.leased -= 1
+            pooled.last_used = time.monotonic()
+            if pooled.uses >= self.config.pool_max_uses:
+                pooled.retiring = True
+            await self._evict_idle()
+            self._condition.notify_all()
+
+    def _pick_browser(self) -> Optional[_PooledBrowser]:
+        candidates = [
+            pooled for pooled in self._browsers
+            if pooled.healthy
+            and pooled.uses < self.config.pool_max_uses
+            and pooled.leased < self.config.pool_contexts_per_browser
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda pooled: pooled.leased)
+
+    async def _start_browser(self) -> _PooledBrowser:
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        browser = await self._launch_browser(self._playwright)
+        pooled = _PooledBrowser(browser)
+        browser.on('disconnected', lambda _: setattr(pooled, 'retiring', True))
+        self._browsers.append(pooled)
+        self.logger.info("Started browser process (%s/%s)", len(self._browsers), self.config.pool_max_browsers)
+        return pooled
+
+    async def _evict_idle(self) -> None:
+        now = time.monotonic()
+        for pooled in list(self._browsers):
+            if pooled.leased:
+                continue
+            expired = now - pooled.last_used > self.config.pool_idle_timeout
+            if pooled.retiring or expired or not pooled.browser.is_connected():
+                self._browsers.remove(pooled)
+                await self._close_quietly(pooled.browser)
+
+    async def new_request_context(self, **options: Any) -> APIRequestContext:
+        """
+        An HTTP client with its own connection pool on the pool's Playwright
+        driver, for requests that need no page.
+        """
+        async with self._condition:
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            playwright = self._playwright
+        return await playwright.request.new_context(**options)
+
+    async def quarantine(self, lease: BrowserLease) -> None:
+        identity = lease.identity
+        if self.sessions and identity:
+            self.sessions.quarantine(identity)
+            self.logger.warning("Quarantined blocked identity %s", identity.key)
+        if not (self.sessions and identity and identity.proxy and self.sessions.has_alternative(identity)):
+            # The same connection goes out next, so the fingerprint of the browser process is all that can change
+            lease.owner.retiring = True
+            self.logger.warning("Retiring blocked browser process")
+
+    async def _save_session(self, lease: BrowserLease) -> None:
+        """
+        Records how long the finished search took and refreshes the saved
+        state of its identity when it is missing or due.
+        """
+        self.sessions.record(lease.warm, time.monotonic() - lease.started_at)
+        if not self.sessions.needs_save(lease.identity):
+            return
+        try:
+            await self.sessions.save(lease.identity, lease.context)
+        except Exception as e:
+            self.logger.warning("Could not save session state %s: %s", lease.identity.key, e)
+
+    async def _open_page(self, pooled: _PooledBrowser) -> BrowserLease:
+        while pooled.idle_contexts:
+            lease = pooled.idle_contexts.pop()
+            if not lease.page.is_closed():
+                lease.traffic.reset()
+                # A recycled context keeps its cookies, and its HTTP cache when requests are not routed
+                return replace(lease, warm=True)
+            await self._close_quietly(lease.context)
+        identity, state_path = self.sessions.checkout() if self.sessions else (None, None)
+        context = await self._new_context(pooled, identity, state_path)
+        if state_path and context is None:
+            self.sessions.discard(identity)
+            state_path = None
+            context = await self._new_context(pooled, identity, None)
+        traffic = TrafficMonitor(self.config.resource_policy)
+        await traffic.attach(context)
         page = await context.new_page()
+        page.on('crash', lambda _: setattr(pooled, 'retiring', True))
         if self.config.stealth_mode:
             await self._apply_stealth_mode(page)
-        return context, page
+        return BrowserLease(
+            context=context, page=page, owner=pooled, traffic=traffic, identity=identity, warm=state_path is not None
+        )
+
+    async def _new_context(self, pooled: _PooledBrowser, identity: Optional[Any], state_path: Optional[str]) -> Optional[BrowserContext]:
+        """
+        Creates a context for `identity`. Returns None when the saved state
+        could not be restored, so the caller can start cold instead.
+        """
+        options = {
+            'user_agent': self.config.user_agent,
+            'extra_http_headers': self.config.custom_headers,
+        }
+        if identity is not None and identity.proxy:
+            options['proxy'] = {'server': identity.proxy}
+        if state_path is None:
+            return await pooled.browser.new_context(**options)
+        try:
+            return await pooled.browser.new_context(storage_state=state_path, **options)
+        except Exception as e:
+            self.logger.warning("Could not restore session state %s: %s", identity.key, e)
+            return None
 
     async def _launch_browser(self, playwright: Playwright) -> BrowserClient:
         launch_options = {
@@ -47,14 +228,36 @@ class BrowserManager(BrowserLauncher):
     async def _apply_stealth_mode(self, page: Page) -> None:
         await page.add_init_script(self.config.stealth_script)
 
-    async def close(self) -> None:
+    async def _close_quietly(self, closable: Any) -> None:
         try:
-            if self._browser:
-                await self._browser.close()
-            if self._playwright:
-                await self._playwright.stop()
+            await closable.close()
         except Exception as e:
-            self.logger.warning(f"Error during cleanup: {str(e)}")
+            self.logger.warning("Error during cleanup: %s", e)
+
+    async def close(self) -> None:
+        async with self._condition:
+            browsers, self._browsers = self._browsers, []
+            for pooled in browsers:
+                await self._close_quietly(pooled.browser)
+            if self.sessions and (self.sessions.stats.warm or self.sessions.stats.cold):
+                self.logger.info("Session state: %s", self.sessions.stats.summary())
+                if TrafficMonitor(self.config.resource_policy).routing:
+                    self.logger.info("HTTP cache was off in every context: the resource policy routes requests")
+            try:
+                if self._playwright:
+                    await self._playwright.stop()
+            except Exception as e:
+                self.logger.warning("Error during cleanup: %s", e)
+            self._playwright = None
+
+
+def _span_labels(name: Optional[str]) -> dict[str, str]:
+    """
+    Spans are labelled with the SelectorConfig field name, never the selector
+    itself: formatted selectors carry dates and labels, and every distinct
+    label value would start a new histogram series.
+    """
+    return {'selector': name} if name else {}
 
 
 @dataclass
@@ -64,32 +267,76 @@ class PageInteractor:
     """
     client: BrowserClient
     logger: Logger
+    pacer: Pacer = field(default_factory=HumanPacer)
+    tracer: Tracer = field(default_factory=NullTracer)
+    delay_total: float = 0.0 # Seconds spent in deliberate delays during this session
+    popups_dismissed: int = 0
+    blocked_statuses: tuple = (403, 429) # Navigation statuses raised as BlockedError
+    challenge_url_pattern: Optional[str] = None # Navigations landing on a matching URL raise BlockedError
 
     async def navigate(self, url: str) -> None:
-        self.logger.info(f"Navigating to {url}")
-        await self.client.goto(url)
+        self.logger.info("Navigating to %s", url)
+        self.delay_total += await self.pacer.throttle(url)
+        with self.tracer.span('goto'):
+            response = await self.client.goto(url)
+        if response is not None and response.status in self.blocked_statuses:
+            raise BlockedError(f"Navigation to {url} answered {response.status}")
+        if self.challenge_url_pattern and re.search(self.challenge_url_pattern, self.client.url):
+            raise BlockedError(f"Navigation to {url} landed on a challenge at {self.client.url}")
 
-    async def fill_input(self, selector: str, value: str) -> None:
-        self.logger.info(f"Filling input {selector} with value {value}")
-        await self.client.fill(selector, value)
+    async def fill_input(self, selector: str, value: str, name: Optional[str] = None) -> None:
+        self.logger.debug("Filling input %s with value %s", selector, value)
+        with self.tracer.span('fill', **_span_labels(name)):
+            await self.client.fill(selector, value)
         await self.random_delay(300, 900)
 
-    async def click_element(self, selector: str) -> None:
-        self.logger.info(f"Clicking element {selector}")
-        await self.client.click(selector)
+    async def click_element(self, selector: str, name: Optional[str] = None) -> None:
+        self.logger.debug("Clicking element %s", selector)
+        self.delay_total += await self.pacer.throttle(self.client.url)
+        with self.tracer.span('click', **_span_labels(name)):
+            await self.client.click(selector)
+        await self.random_delay(300, 800)
+
+    async def click_repeatedly(self, selector: str, times: int, name: Optional[str] = None) -> None:
+        """
+        Clicks an element `times` times in one in-page action, pausing once.
+        """
+        self.logger.debug("Clicking element %s %d times", selector, times)
+        with self.tracer.span('click_repeatedly', **_span_labels(name)):
+            await self.client.eval_on_selector(selector, CLICK_TIMES_JS, times)
         await self.random_delay(300, 800)
 
-    async def wait_for_element(self, selector: str) -> None:
-        self.logger.info(f"Waiting for element {selector}")
-        await self.client.wait_for_selector(selector)
+    async def wait_for_element(self, selector: str, timeout: Optional[int] = None, name: Optional[str] = None) -> None:
+        self.logger.debug("Waiting for element %s", selector)
+        with self.tracer.span('wait_for', **_span_labels(name)):
+            if timeout is None:
+                await self.client.wait_for_selector(selector)
+            else:
+                await self.client.wait_for_selector(selector, timeout=timeout)
         await self.random_delay(100, 500)
 
-    async def inner_text(self, selector: str) -> str:
-        self.logger.info(f"Getting inner text of {selector}")
-        text = await self.client.inner_text(selector)
+    async def inner_text(self, selector: str, name: Optional[str] = None) -> str:
+        self.logger.debug("Getting inner text of %s", selector)
+        with self.tracer.span('inner_text', **_span_labels(name)):
+            text = await self.client.inner_text(selector)
         await self.random_delay(100, 200)
         return text
 
+    async def dismiss_popups(self, popup_selector: str, button_selector: str) -> None:
+        """
+        Clicks `button_selector` whenever `popup_selector` is visible before
+        an action, so pages without the popup pay no extra roundtrip.
+        """
+        async def dismiss() -> None:
+            self.logger.info("Dismissing popup %s", popup_selector)
+            self.popups_dismissed += 1
+            await self.client.click(button_selector)
+
+        await self.client.add_locator_handler(self.client.locator(popup_selector), dismiss)
+
+    async def stop_dismissing_popups(self, popup_selector: str) -> None:
+        await self.client.remove_locator_handler(self.client.locator(popup_selector))
+
     async def handle_popup(self, popup_selector: str, action: str = "accept") -> None:
         if await self.client.query_selector(popup_selector):
             if action == "accept":
@@ -99,5 +346,7 @@ class PageInteractor:
             await self.random_delay(1000, 2000)
 
     async def random_delay(self, min_ms: int, max_ms: int) -> None:
-        await self.client.wait_for_timeout(random.randint(min_ms, max_ms))
-
+        seconds = self.pacer.delay(min_ms, max_ms)
+        if seconds > 0:
+            self.delay_total += seconds
+            await asyncio.sleep(seconds)
@@ -1,12 +1,21 @@
-from dataclasses import dataclass, field
+import asyncio
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
 from logging import Logger
-from typing import Optional
+import os
+import random
+import time
+from typing import Iterator, Optional
 
-from infrastructure.base_browser import BrowserClient, BrowserLauncher
+from infrastructure.base_browser import BrowserClient, BrowserLauncher, BrowserLease
 from infrastructure.browser import PageInteractor
-from infrastructure.config_browser import SelectorConfig
+from infrastructure.config_browser import InterceptConfig, MetricsConfig, SelectorConfig
 from infrastructure.data_parser import DataParser
-from infrastructure.error_handler import ErrorHandler
+from infrastructure.error_handler import ErrorHandler, ErrorKind
+from infrastructure.locators import LocatorRegistry, SelectorProfile
+from infrastructure.metrics import NullTracer, Tracer
+from infrastructure.pacing import HumanPacer, Pacer
+from infrastructure.traffic import TrafficStats
 
 
 @dataclass
@@ -14,27 +23,132 @@ class BrowserService:
     launcher: BrowserLauncher
     logger: Logger
     selector_config: SelectorConfig
+    intercept_config: InterceptConfig = field(default_factory=InterceptConfig)
+    pacer: Pacer = field(default_factory=HumanPacer)
+    tracer: Tracer = field(default_factory=NullTracer)
+    metrics_config: MetricsConfig = field(default_factory=MetricsConfig)
+    error_handler: Optional[ErrorHandler] = None # Shared by every session, built from `logger` when unset
+    selector_profile: SelectorProfile = field(default_factory=SelectorProfile) # Shared by every session
+    traffic: Optional[TrafficStats] = field(default=None, init=False)
+    delay_total: float = field(default=0.0, init=False)
+    timings: dict[str, float] = field(default_factory=dict, init=False)
+    page_loads: int = field(default=0, init=False)
+    retries: int = field(default=0, init=False)
+    _lease: Optional[BrowserLease] = field(default=None, init=False)
+    _opened_at: float = field(default=0.0, init=False)
+    _tracing: bool = field(default=False, init=False)
     _client: Optional[BrowserClient] = field(default=None, init=False)
     _interactor: Optional[PageInteractor] = field(default=None, init=False)
     _parser: Optional[DataParser] = field(default=None, init=False)
+    _locators: Optional[LocatorRegistry] = field(default=None, init=False)
+
+    def __post_init__(self) -> None:
+        if self.error_handler is None:
+            self.error_handler = ErrorHandler(self.logger)
+
+    def session(self) -> 'BrowserService':
+        """
+        Returns an unopened copy sharing the launcher and configuration, so
+        concurrent searches each get their own page, interactor and parser.
+        """
+        return replace(self)
+
+    @contextmanager
+    def timed(self, step: str) -> Iterator[None]:
+        """
+        Adds the wall time spent in the block to `timings[step]` and records
+        it as a span.
+        """
+        started = time.perf_counter()
+        try:
+            with self.tracer.span(step):
+                yield
+        finally:
+            self.timings[step] = self.timings.get(step, 0.0) + time.perf_counter() - started
 
     async def __aenter__(self):
-        self.context, self._client = await self.launcher.launch()
-        self._interactor = PageInteractor(self._client, self.logger)
-        self._parser = DataParser(self._client, self.selector_config, self.logger)
+        self._opened_at = time.perf_counter()
+        with self.tracer.span('launch'):
+            self._lease = await self.launcher.launch()
+        self.context, self._client = self._lease.context, self._lease.page
+        retry = self.error_handler.config
+        self._interactor = PageInteractor(
+            self._client,
+            self.logger,
+            pacer=self.pacer,
+            tracer=self.tracer,
+            blocked_statuses=retry.blocked_statuses,
+            challenge_url_pattern=retry.challenge_url_pattern,
+        )
+        self._locators = LocatorRegistry(self._client, self.selector_config, self.selector_profile, self.tracer)
+        self._parser = DataParser(
+            self._client, self.selector_config, self.logger, intercept=self.intercept_config, tracer=self.tracer
+        )
+        if self.selector_config.consent_banner:
+            await self._interactor.dismiss_popups(self.selector_config.consent_banner, self.selector_config.consent_accept)
+        if random.random() < self.metrics_config.playwright_trace_rate:
+            await self.context.tracing.start(screenshots=True, snapshots=True)
+            self._tracing = True
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.timings:
+            steps = ', '.join(f"{step}={seconds:.2f}s" for step, seconds in self.timings.items())
+            self.logger.info("Step timings: %s", steps)
+        if self.retries:
+            self.logger.info("Retried steps: %s", self.retries)
+        if self._interactor:
+            self.delay_total = self._interactor.delay_total
+            self.logger.info("Deliberate delays: %.2fs", self.delay_total)
+            if self._interactor.popups_dismissed:
+                self.logger.info("Popups dismissed: %s", self._interactor.popups_dismissed)
+        if self._lease and self._lease.traffic:
+            self.traffic = self._lease.traffic.stats
+            self.logger.info("Traffic: %s", self.traffic.summary())
+        if self._tracing:
+            await self._stop_tracing(failed=exc_type is not None)
         try:
-            if exc_type is not None:
-                error_handler = ErrorHandler(self.logger)
-                await error_handler.handle_error(self._client, exc_val)
+            # a cancelled search (hedge loser, deadline, shutdown) is not a failure of the page
+            if exc_type is not None and self._lease and not issubclass(exc_type, asyncio.CancelledError):
+                kind = await self.error_handler.handle_error(self._client, exc_val)
+                if kind is ErrorKind.BLOCKED:
+                    await self.launcher.quarantine(self._lease)
         finally:
-            if self._client:
-                await self.launcher.close()
+            if self._lease:
+                if exc_type is None and self.selector_config.consent_banner:
+                    await self._remove_popup_handler()
+                await self.launcher.release(self._lease, discard=exc_type is not None)
+            self._lease = None
             self._client = None
             self._interactor = None
             self._parser = None
+            self._locators = None
+
+    async def _remove_popup_handler(self) -> None:
+        """
+        A recycled page must not carry this session's handler into the next one.
+        """
+        try:
+            await self._interactor.stop_dismissing_popups(self.selector_config.consent_banner)
+        except Exception as e:
+            self.logger.warning("Could not remove popup handler: %s", e)
+
+    async def _stop_tracing(self, failed: bool) -> None:
+        """
+        Keeps the sampled Playwright trace only for failed or slow searches.
+        """
+        self._tracing = False
+        elapsed = time.perf_counter() - self._opened_at
+        try:
+            if failed or elapsed >= self.metrics_config.slow_search_threshold:
+                os.makedirs(self.metrics_config.trace_dir, exist_ok=True)
+                path = os.path.join(self.metrics_config.trace_dir, f"trace-{int(time.time() * 1000)}.zip")
+                await self.context.tracing.stop(path=path)
+                self.logger.info("Saved Playwright trace of a %.1fs search to %s", elapsed, path)
+            else:
+                await self.context.tracing.stop()
+        except Exception as e:
+            self.logger.warning("Could not stop Playwright tracing: %s", e)
 
     @property
     def selectors(self) -> SelectorConfig:
@@ -52,6 +166,12 @@ class BrowserService:
             raise RuntimeError("PageInteractor not initialized")
         return self._interactor
 
+    @property
+    def locators(self) -> LocatorRegistry:
+        if self._locators is None:
+            raise RuntimeError("LocatorRegistry not initialized")
+        return self._locators
+
     @property
     def parser(self) -> DataParser:
         if self._parser is None:
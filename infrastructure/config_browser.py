@@ -2,6 +2,28 @@ from dataclasses import dataclass, field
 from typing import Optional
 
 
+@dataclass
+class ResourcePolicy:
+    """
+    Declarative request routing policy applied to every browser context.
+    Allow patterns win over every block rule; page navigations are never blocked.
+    Playwright disables the HTTP cache of a routed context, so with any block
+    rule active, recycled contexts reuse cookies but not cached responses.
+    """
+    enabled: bool = True
+    block_resource_types: tuple = ('image', 'media', 'font')
+    block_url_patterns: tuple = (
+        r'google-analytics\.com',
+        r'googletagmanager\.com',
+        r'doubleclick\.net',
+        r'facebook\.(net|com)',
+        r'/(analytics|beacon|collect)\b',
+    )
+    block_third_party: bool = True # Block hosts other than the page host and first_party_domains
+    first_party_domains: tuple = ('united.com',) # Domains (and subdomains) treated as first party
+    allow_url_patterns: tuple = (r'/api/',) # Always allowed, e.g. the shopping API
+
+
 @dataclass
 class BrowserConfig:
     """
@@ -14,6 +36,13 @@ class BrowserConfig:
     user_agent: str = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36'
     custom_headers: dict = None # Custom HTTP headers to be sent with requests
     stealth_mode: bool = True # Enable stealth mode to avoid detection by anti-bot systems
+    resource_policy: ResourcePolicy = field(default_factory=ResourcePolicy) # Requests blocked per context
+    # Browser pool
+    pool_max_browsers: int = 2 # Long-lived browser processes kept by BrowserManager
+    pool_contexts_per_browser: int = 4 # Concurrent leases served by one browser process
+    pool_max_uses: int = 50 # Recycle a browser process after this many leases
+    pool_idle_timeout: float = 300.0 # Seconds an unused browser process is kept warm
+    pool_reuse_contexts: bool = False # Recycle released contexts instead of creating fresh ones
     _stealth_script: str = """Object.defineProperty(navigator, 'webdriver', { get: () => undefined })"""  
 
     @property
@@ -21,6 +50,198 @@ class BrowserConfig:
         return self._stealth_script
 
 
+@dataclass
+class SessionConfig:
+    """
+    Configuration for restoring cookies and localStorage in new browser contexts.
+    """
+    enabled: bool = True
+    state_dir: str = '.sessions' # One storage state file per identity
+    identities: tuple = () # Proxy servers rotated across new contexts, the browser's own proxy when empty
+    max_age: float = 3600.0 # Seconds before a saved state is dropped and warmed up again
+    max_uses: int = 100 # Searches started from one saved state before it is rotated
+    save_interval: float = 300.0 # Seconds before a saved state is refreshed from a finished search
+    quarantine_seconds: float = 900.0 # Seconds a blocked identity is kept out of rotation
+
+
+@dataclass
+class RetryConfig:
+    """
+    Configuration for retrying failed search steps and keeping evidence of failures.
+    """
+    max_attempts: int = 3 # Attempts per step when the error is transient
+    backoff_base: float = 0.5 # Seconds before the first retry, doubled on each attempt
+    backoff_max: float = 8.0 # Upper bound of the backoff before jitter
+    blocked_statuses: tuple = (403, 429) # Navigation statuses treated as a bot block
+    challenge_url_pattern: str = r'captcha|challenge|/blocked' # Navigations landing here are a bot block
+    evidence_rate: float = 0.1 # Share of failed searches saved with a screenshot and HTML
+    evidence_max_bytes: int = 2_000_000 # Larger screenshots are skipped and HTML is truncated
+    evidence_timeout: float = 5.0 # Seconds allowed to grab evidence from the page
+    evidence_dir: str = 'evidence'
+
+
+@dataclass
+class DeepLinkConfig:
+    """
+    Configuration for jumping straight to the results page by URL.
+    """
+    enabled: bool = True # Try the deep link before falling back to the search form
+    results_path: str = '/fsr/choose-flights' # Appended to FlightSearchRequest.url
+    render_timeout: int = 20000 # Milliseconds to wait for results before falling back
+    extra_params: dict = field(default_factory=lambda: {'taxng': '1', 'newHP': 'True', 'clm': '7'})
+    # Position of each passenger category in the comma separated `px` parameter
+    passenger_slots: dict = field(default_factory=lambda: {
+        'Adults': 0,
+        'Seniors': 1,
+        'Children (15-17)': 2,
+        'Children (12-14)': 3,
+        'Children (5-11)': 4,
+        'Children': 5,
+        'Infants (in seat)': 6,
+        'Infants (on lap)': 7,
+    })
+    # Value of the `sc` parameter per FlightSearchRequest.cabinType
+    cabin_codes: dict = field(default_factory=lambda: {
+        'economy': '7',
+        'business': '2',
+        'first': '6',
+    })
+
+
+@dataclass
+class InterceptConfig:
+    """
+    Configuration for reading search results from the shopping API response.
+    """
+    enabled: bool = True # Parse the captured JSON payload before falling back to the DOM
+    url_pattern: str = r'/api/flight/FetchFlights' # Regex matched against response URLs
+    timeout: int = 30000 # Milliseconds to wait for either the response or rendered results
+    currency_symbols: dict = field(default_factory=lambda: {'GBP': '£', 'USD': '$', 'EUR': '€'})
+    # Products whose price the results page shows, per FlightSearchRequest.cabinType;
+    # a cabin without an entry takes the cheapest price of any product
+    product_types: dict = field(default_factory=lambda: {
+        'economy': ('ECONOMY',),
+        'business': ('BUSINESS', 'MIN-BUSINESS-OR-FIRST'),
+        'first': ('FIRST', 'MIN-BUSINESS-OR-FIRST'),
+    })
+
+
+@dataclass
+class PacingConfig:
+    """
+    Configuration for the deliberate delays between page actions.
+    """
+    profile: str = 'human' # 'human' for random pauses, 'fast' for none
+    seed: Optional[int] = None # Seed for reproducible human-like pauses
+    origin_rate: float = 0.0 # Navigations/clicks per second per origin across all sessions, 0 disables
+    origin_burst: int = 5 # Actions allowed back to back before the rate applies
+
+
+@dataclass
+class MetricsConfig:
+    """
+    Configuration for step timing spans and sampled Playwright traces.
+    """
+    enabled: bool = False # Record spans and latency histograms
+    max_spans: int = 10000 # Most recent spans kept for the JSON trace
+    playwright_trace_rate: float = 0.0 # Share of searches recorded with Playwright tracing
+    slow_search_threshold: float = 30.0 # Sampled traces are kept only for searches slower than this (s) or failed
+    trace_dir: str = 'traces'
+
+
+@dataclass
+class CacheConfig:
+    """
+    Configuration for the flight search result cache.
+    """
+    enabled: bool = True
+    ttl: float = 300.0 # Seconds a cached result is served as fresh
+    stale_while_revalidate: float = 0.0 # Extra seconds a stale result is served while refreshing
+    max_entries: int = 1024 # Least recently used entries are evicted beyond this size
+    disk_path: Optional[str] = None # Directory for the on-disk backend, memory only when unset
+
+
+@dataclass
+class PriceStoreConfig:
+    """
+    Configuration for the local price history.
+    """
+    enabled: bool = True # Record every finished search
+    path: str = 'prices.sqlite3' # SQLite database file
+
+
+@dataclass
+class FanOutConfig:
+    """
+    Configuration for querying several providers per search.
+    """
+    providers: tuple = ('united',) # Names of the enabled providers, see settings.containers
+    deadline: float = 60.0 # Seconds until the answer is returned with whatever has arrived
+    hedge_after: Optional[float] = None # Seconds before a slow provider gets a second attempt, None disables
+
+
+@dataclass
+class ReplayConfig:
+    """
+    Configuration for answering searches by replaying the shopping API request
+    without a browser.
+    """
+    enabled: bool = False
+    harvest_interval: float = 900.0 # Seconds before cookies and tokens are harvested again from a browser
+    harvest_timeout: int = 30000 # Milliseconds to wait for the API request during a harvest
+    harvest_cooldown: float = 300.0 # Seconds searches go straight to the browser after a failed harvest
+    timeout: int = 15000 # Milliseconds per replayed request
+    max_in_flight: int = 32 # Concurrent replayed requests
+    rejected_statuses: tuple = (401, 403, 429) # Answers that mean the tokens are stale or the client is challenged
+    # Harvested request headers that are not replayed; cookies come from the storage state instead
+    skip_headers: tuple = ('content-length', 'cookie', 'host', 'connection', 'accept-encoding')
+    # Results page parameter -> field of the API request it is written to, dotted for nested JSON
+    # (e.g. 'Trips.0.Origin'). Empty sends the results page parameters as they are
+    request_fields: dict = field(default_factory=dict)
+    # Trip fields of the API response checked against the search, so a replay the API answered
+    # for another route or date is refused instead of returning the wrong flights
+    trip_origin: str = 'Origin'
+    trip_destination: str = 'Destination'
+    trip_date: str = 'DepartDate'
+
+
+@dataclass
+class ServerConfig:
+    """
+    Configuration for the long-running search daemon.
+    """
+    host: str = '127.0.0.1'
+    port: int = 8080
+    unix_socket: Optional[str] = None # Listen on this socket path instead of host/port
+    workers: int = 4 # Searches run concurrently
+    max_queue: int = 100 # Queued searches beyond this are rejected with 429
+    drain_timeout: float = 60.0 # Seconds to finish queued work on shutdown
+    max_body: int = 65536 # Largest accepted request body in bytes
+
+
+@dataclass
+class ProcessPoolConfig:
+    """
+    Configuration for running searches across several worker processes.
+    """
+    workers: int = 2 # Worker processes, each with its own Playwright driver and browser pool
+    concurrency_per_worker: int = 4 # Searches in flight inside one worker
+    max_restarts: int = 3 # Crashed workers restarted per run before their work is failed
+
+
+@dataclass
+class LogConfig:
+    """
+    Configuration for the structured logger.
+    """
+    level: str = 'INFO' # Records below this level are dropped before any formatting
+    format: str = 'text' # 'text' for console lines, 'json' for one JSON record per line
+    queue_size: int = 10000 # Records waiting for the writer thread; more are dropped and counted
+    repeat_limit: int = 20 # Records per message template per window, 0 disables rate limiting
+    repeat_window: float = 1.0 # Seconds
+    repeat_templates: int = 1024 # Message templates tracked by the rate limiter, least recently seen dropped first
+
+
 @dataclass
 class SelectorConfig:
     """
@@ -43,11 +264,15 @@ class SelectorConfig:
     ##Passengers
     passengers_field: str = 'input.atm-c-textfield__input.atm-c-text-input--hover[type="button"]'
     popup_modal: str = 'div.atm-c-popupmodal_modal'
-    passenger_row: str = 'div.app-components-PassengerSelector-passengers__passengerRow--XpEDd:has(span:has-text(\"{category_label}\"))'
+    passenger_row: str = 'div.app-components-PassengerSelector-passengers__passengerRow--XpEDd:has(span:text-is("{category_label}"))'
     caption_el: str = 'input.atm-c-counter__input'
     plus_btn: str = 'button:has(span:has-text("Add"))'
     minus_btn: str = 'button:has(span:has-text("Subtract"))'
     
+    ##Popups
+    consent_banner: str = '#onetrust-banner-sdk' # Dismissed whenever it blocks an action, empty disables
+    consent_accept: str = '#onetrust-accept-btn-handler'
+
     ##Class
     class_input: str = 'select#cabinType'
     
@@ -62,3 +287,36 @@ class SelectorConfig:
     arrival: str = 'span.app-components-Shopping-FlightBaseCard-styles__flightBaseCardContainer__time--DRWoI'
     duration: str = 'div.app-components-Shopping-FlightInfoBlock-styles__dividerText--Gwk7g:has(span:has-text("Duration"))'
     stop: str = 'div.app-components-Shopping-FlightBaseCard-styles__flightHeaderRight--QmZQI'
+    show_more_btn: str = 'button:has(span:has-text("Show more flights"))'
+
+    # Cheaper candidates tried before the selector of the same name, in order.
+    # Override an entry to swap a slow selector without touching code; an
+    # empty tuple uses the named selector alone.
+    fallbacks: dict = field(default_factory=lambda: {
+        'search_button': ('button[type="submit"][aria-label="Find flights"]', 'role=button[name="Find flights"]'),
+        'passenger_row': ('[role="group"][aria-label="{category_label}"]',),
+        'plus_btn': ('button[aria-label^="Add"]',),
+        'minus_btn': ('button[aria-label^="Subtract"]',),
+    })
+    resolve_timeout: int = 15000 # Milliseconds to wait for any candidate of an entry to appear
+
+    def candidates(self, name: str, **params: str) -> list[str]:
+        """
+        Selectors to try for the entry `name`, preferred first, with `params`
+        filled into their templates.
+        """
+        ordered = dict.fromkeys((*self.fallbacks.get(name, ()), getattr(self, name)))
+        return [selector.format(**params) if params else selector for selector in ordered]
+
+    def result_fields(self) -> dict[str, str]:
+        """
+        Selectors for the fields of a single flight card, keyed by Flight attribute.
+        """
+        return {
+            'airline': self.airline,
+            'departure': self.departure,
+            'arrival': self.arrival,
+            'duration': self.duration,
+            'price': self.flight_cost,
+            'stop': self.stop,
+        }
@@ -1,10 +1,168 @@
-from dataclasses import dataclass
+import asyncio
+from dataclasses import dataclass, field
 from logging import Logger
+import re
+from typing import Any, AsyncIterator, Collection, Optional
 
 from domain.entities.flight import Flight
 
 from infrastructure.base_browser import BrowserClient
-from infrastructure.config_browser import SelectorConfig
+from infrastructure.config_browser import InterceptConfig, SelectorConfig
+from infrastructure.metrics import NullTracer, Tracer
+
+
+# Playwright's `:has(tag:has-text("..."))` is not valid CSS inside the page,
+# so it is split into a plain selector plus a text filter for in-page queries.
+_HAS_TEXT = re.compile(r'^(?P<css>.*):has\((?P<has>[^():]+):has-text\("(?P<text>.*)"\)\)$')
+
+_EXTRACT_CARDS_JS = """
+(cards, {fields, start}) => ({total: cards.length, records: cards.slice(start).map(card => {
+    const record = {};
+    for (const field of fields) {
+        let matches;
+        try {
+            matches = Array.from(card.querySelectorAll(field.css));
+        } catch (e) {
+            matches = [];
+        }
+        if (field.text !== null) {
+            const text = field.text.toLowerCase();
+            matches = matches.filter(el => Array.from(el.querySelectorAll(field.has)).some(
+                child => child.textContent.toLowerCase().includes(text)
+            ));
+        }
+        const el = matches[field.nth];
+        record[field.name] = el ? el.innerText : null;
+    }
+    return record;
+})})
+"""
+
+_MORE_CARDS_JS = "([selector, count]) => document.querySelectorAll(selector).length > count"
+
+
+def _field_specs(selectors: SelectorConfig) -> list[dict[str, Any]]:
+    """
+    Describes each card field for extraction. Fields sharing a selector (departure
+    and arrival times) take successive matches instead of all reading the first.
+    """
+    specs = []
+    seen: dict[str, int] = {}
+    for name, selector in selectors.result_fields().items():
+        match = _HAS_TEXT.match(selector)
+        specs.append({
+            'name': name,
+            'selector': selector,
+            'css': match['css'] if match else selector,
+            'has': match['has'] if match else None,
+            'text': match['text'] if match else None,
+            'nth': seen.get(selector, 0),
+        })
+        seen[selector] = seen.get(selector, 0) + 1
+    return specs
+
+
+def _format_minutes(total: int) -> str:
+    hours, minutes = divmod(int(total), 60)
+    return f'{hours}H, {minutes}M' if minutes else f'{hours}H'
+
+
+def _format_stops(stops: int) -> str:
+    if not stops:
+        return 'NONSTOP'
+    return f'{stops} STOP' if stops == 1 else f'{stops} STOPS'
+
+
+def flights_from_payload(
+    payload: Any,
+    currency_symbols: dict[str, str],
+    product_types: Collection[str] = ()
+) -> list[Flight]:
+    """
+    Maps the shopping API payload (data.Trips[].Flights[]) to Flight objects
+    formatted like the rendered cards. The price is the cheapest one among
+    the `product_types` (any product when empty); products without a price
+    are ignored.
+    """
+    trips = ((payload or {}).get('data') or {}).get('Trips') or []
+    flights = []
+    for trip in trips:
+        for item in trip.get('Flights') or []:
+            prices = [
+                price
+                for product in item.get('Products') or []
+                if not product_types or product.get('ProductType') in product_types
+                for price in product.get('Prices') or []
+                if price.get('Amount') is not None
+            ]
+            cheapest = min(prices, key=lambda price: price['Amount']) if prices else None
+            currency = cheapest.get('Currency', '') if cheapest else ''
+            equipment = (item.get('EquipmentDisclosures') or {}).get('EquipmentDescription')
+            airline = f"{item.get('MarketingCarrier', '')} {item.get('FlightNumber', '')}".strip()
+            flights.append(Flight(
+                airline=f'{airline} ({equipment})' if equipment else airline,
+                departure=(item.get('DepartDateTime') or '')[-5:] or None,
+                arrival=(item.get('DestinationDateTime') or '')[-5:] or None,
+                duration=_format_minutes(item['TravelMinutesTotal']) if item.get('TravelMinutesTotal') else None,
+                price=f"{currency_symbols.get(currency, currency)}{cheapest['Amount']:,.0f}" if cheapest else None,
+                stop=_format_stops(len(item.get('Connections') or [])),
+            ).parse())
+    return flights
+
+
+@dataclass
+class ResponseCapture:
+    """
+    Listens for the first shopping API response matching the configured URL
+    pattern and keeps its JSON payload. Must be armed before the page requests it.
+    """
+    client: BrowserClient
+    config: InterceptConfig
+    logger: Logger
+    _payload: Optional[asyncio.Future] = field(default=None, init=False)
+    _reads: set = field(default_factory=set, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._pattern = re.compile(self.config.url_pattern)
+        self._payload = asyncio.get_running_loop().create_future()
+        self.client.on('response', self._on_response)
+
+    @property
+    def payload(self) -> Any:
+        if self._payload.done() and not self._payload.cancelled():
+            return self._payload.result()
+        return None
+
+    async def wait(self, timeout: Optional[int] = None) -> Any:
+        timeout = self.config.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._payload), timeout / 1000)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.client.remove_listener('response', self._on_response)
+        if not self._payload.done():
+            self._payload.cancel()
+        for task in self._reads:
+            task.cancel()
+
+    def _on_response(self, response: Any) -> None:
+        if self._payload.done() or not response.ok or not self._pattern.search(response.url):
+            return
+        task = asyncio.create_task(self._read(response))
+        self._reads.add(task)
+        task.add_done_callback(self._reads.discard)
+
+    async def _read(self, response: Any) -> None:
+        try:
+            payload = await response.json()
+        except Exception as e:
+            self.logger.warning("Could not decode results response %s: %s", response.url, e)
+            return
+        if not self._payload.done():
+            self.logger.info("Captured results response %s", response.url)
+            self._payload.set_result(payload)
 
 
 @dataclass
@@ -12,35 +170,169 @@ class DataParser:
     client: BrowserClient
     selectors: SelectorConfig
     logger: Logger
+    single_roundtrip: bool = True # Extract every card in one in-page evaluation
+    intercept: InterceptConfig = field(default_factory=InterceptConfig)
+    stream_idle_timeout: int = 5000 # Milliseconds to wait for more cards before a stream ends
+    tracer: Tracer = field(default_factory=NullTracer)
+
+    def capture_results(self) -> Optional[ResponseCapture]:
+        """
+        Arms a listener for the results API response, or returns None when
+        interception is disabled.
+        """
+        if not self.intercept.enabled:
+            return None
+        return ResponseCapture(self.client, self.intercept, self.logger)
+
+    async def wait_for_results(self, capture: Optional[ResponseCapture] = None, timeout: Optional[int] = None) -> bool:
+        """
+        Returns True as soon as the results response is captured or the result
+        cards render, whichever happens first, and False if neither does in time.
+        """
+        timeout = self.intercept.timeout if timeout is None else timeout
+        pending = {asyncio.create_task(self.client.wait_for_selector(self.selectors.result_items, timeout=timeout))}
+        if capture is not None:
+            pending.add(asyncio.create_task(capture.wait(timeout)))
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.cancelled() and task.exception() is None and task.result() is not None:
+                        return True
+            return False
+        finally:
+            for task in pending:
+                task.cancel()
 
-    async def parse_flight_data(self) -> list[Flight]:
+    async def parse_flight_data(self, capture: Optional[ResponseCapture] = None, cabin: str = 'economy') -> list[Flight]:
         self.logger.info("Parsing flight data")
+        if capture is not None:
+            await self.wait_for_results(capture)
+            flights = flights_from_payload(
+                capture.payload, self.intercept.currency_symbols, self.intercept.product_types.get(cabin, ())
+            )
+            if flights:
+                self.logger.info("Found %s flights in the results response", len(flights))
+                return flights
+            self.logger.info("No results response captured, parsing the page")
         try:
             await self.client.wait_for_selector(self.selectors.result_items)
         except Exception as e:
-            self.logger.error(f"Error waiting for flight results: {e}")
-            return []    
-        flight_elements = await self.client.query_selector_all(self.selectors.result_items)
-        self.logger.info(f"Found {len(flight_elements)} flight elements")
+            self.logger.error("Error waiting for flight results: %s", e)
+            return []
+        if self.single_roundtrip:
+            records = await self.extract_records()
+        else:
+            records = await self.extract_records_per_element()
         flights = []
-        for el in flight_elements:
-            airline_el = await el.query_selector(self.selectors.airline)
-            departure_el = await el.query_selector(self.selectors.departure)
-            arrival_el = await el.query_selector(self.selectors.arrival)
-            duration_el = await el.query_selector(self.selectors.duration)
-            price_el = await el.query_selector(self.selectors.flight_cost)
-            stop_el = await el.query_selector(self.selectors.stop)
-
-            airline = await airline_el.inner_text()
-            departure = await departure_el.inner_text()
-            arrival = await arrival_el.inner_text()
-            duration = await duration_el.inner_text()
-            price = await price_el.inner_text()
-            stop = await stop_el.inner_text()
-
-            flights.append(
-                Flight(airline, departure, arrival, duration, price, stop)
+        for record in records:
+            flight = Flight(**record).parse()
+            flights.append(flight)
+            self.logger.debug("Parsed flight: %s", flight)
+        self.logger.info("Found %d flights", len(flights))
+        return flights
+
+    async def stream_flight_data(
+        self,
+        capture: Optional[ResponseCapture] = None,
+        max_results: Optional[int] = None,
+        cabin: str = 'economy'
+    ) -> AsyncIterator[Flight]:
+        """
+        Yields flights as their cards appear, loading more results ("show more"
+        or scrolling) until `max_results` or until no new cards show up within
+        `stream_idle_timeout`. Cards already yielded are skipped.
+        """
+        self.logger.info("Streaming flight data")
+        if capture is not None:
+            await self.wait_for_results(capture)
+            flights = flights_from_payload(
+                capture.payload, self.intercept.currency_symbols, self.intercept.product_types.get(cabin, ())
             )
-            self.logger.info(f"Parsed flight: {flights[-1].to_dict()}")
-        self.logger.info(f"Found {len(flights)} flights")
-        return flights
\ No newline at end of file
+            if flights:
+                self.logger.info("Found %s flights in the results response", len(flights))
+                for flight in flights[:max_results]:
+                    yield flight
+                return
+        try:
+            await self.client.wait_for_selector(self.selectors.result_items)
+        except Exception as e:
+            self.logger.error("Error waiting for flight results: %s", e)
+            return
+
+        seen: set[tuple] = set()
+        start = 0
+        while True:
+            total, records = await self._extract_from(start)
+            if total < start:
+                # the list was re-rendered or virtualised, read it again from the top
+                total, records = await self._extract_from(0)
+            for record in records:
+                key = tuple(record.values())
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield Flight(**record).parse()
+                if max_results is not None and len(seen) >= max_results:
+                    return
+            start = total
+            if not await self._load_more(total):
+                self.logger.info("Streamed %s flights", len(seen))
+                return
+
+    async def _load_more(self, count: int) -> bool:
+        """
+        Asks the page for more results and waits until there are more than
+        `count` cards. Returns False when the results are exhausted.
+        """
+        try:
+            if self.selectors.show_more_btn and await self.client.query_selector(self.selectors.show_more_btn):
+                await self.client.click(self.selectors.show_more_btn)
+            else:
+                await self.client.evaluate('() => window.scrollTo(0, document.body.scrollHeight)')
+            await self.client.wait_for_function(
+                _MORE_CARDS_JS, arg=[self.selectors.result_items, count], timeout=self.stream_idle_timeout
+            )
+        except Exception:
+            return False
+        return True
+
+    async def extract_records(self) -> list[dict[str, Optional[str]]]:
+        """
+        Reads all cards and fields in a single evaluation inside the page.
+        Missing fields come back as None.
+        """
+        total, records = await self._extract_from(0)
+        self.logger.info("Found %s flight elements", total)
+        return records
+
+    async def _extract_from(self, start: int) -> tuple[int, list[dict[str, Optional[str]]]]:
+        fields = [
+            {key: spec[key] for key in ('name', 'css', 'has', 'text', 'nth')}
+            for spec in _field_specs(self.selectors)
+        ]
+        with self.tracer.span('extract', selector='result_items'):
+            result = await self.client.eval_on_selector_all(
+                self.selectors.result_items, _EXTRACT_CARDS_JS, {'fields': fields, 'start': start}
+            )
+        return result['total'], result['records']
+
+    async def extract_records_per_element(self) -> list[dict[str, Optional[str]]]:
+        """
+        Reads each field of each card with its own query, one roundtrip per call.
+        """
+        flight_elements = await self.client.query_selector_all(self.selectors.result_items)
+        self.logger.info("Found %s flight elements", len(flight_elements))
+        specs = _field_specs(self.selectors)
+        records = []
+        for el in flight_elements:
+            record = {}
+            for spec in specs:
+                if spec['nth'] == 0:
+                    field_el = await el.query_selector(spec['selector'])
+                else:
+                    matches = await el.query_selector_all(spec['selector'])
+                    field_el = matches[spec['nth']] if len(matches) > spec['nth'] else None
+                record[spec['name']] = await field_el.inner_text() if field_el else None
+            records.append(record)
+        return records
@@ -0,0 +1,46 @@
+from urllib.parse import urlencode
+
+from infrastructure.config_browser import DeepLinkConfig
+from infrastructure.schemas.search import FlightSearchRequest
+
+
+def build_results_url(flight_data: FlightSearchRequest, config: DeepLinkConfig) -> str:
+    """
+    Encodes a search request as a results page URL, e.g.
+    /fsr/choose-flights?f=LONDON&t=CHICAGO&d=2025-10-22&tt=1&sc=7&px=1,0,0,0,0,1,0,0
+    """
+    params = results_params(flight_data, config)
+    return f"{flight_data.url.rstrip('/')}{config.results_path}?{urlencode(params, safe=',')}"
+
+
+def results_params(flight_data: FlightSearchRequest, config: DeepLinkConfig) -> dict[str, str]:
+    """
+    The search parameters of the results page URL, which the results page
+    also sends to the shopping API.
+    """
+    if not flight_data.departure_date:
+        raise ValueError('Departure date must be provided')
+    if flight_data.cabinType not in config.cabin_codes:
+        raise ValueError(f'Unknown class of service: {flight_data.cabinType}')
+
+    passengers = [0] * len(config.passenger_slots)
+    for passenger in flight_data.passengers:
+        if passenger.category not in config.passenger_slots:
+            raise ValueError(f'Unknown passenger category: {passenger.category}')
+        passengers[config.passenger_slots[passenger.category]] += passenger.count
+
+    # validates the YYYY-MM-DD format the same way the form flow does
+    flight_data._formate_date(flight_data.departure_date)
+    params = {
+        'f': flight_data.departure.upper(),
+        't': flight_data.arrival.upper(),
+        'd': flight_data.departure_date,
+    }
+    if flight_data.return_date:
+        flight_data._formate_date(flight_data.return_date)
+        params['r'] = flight_data.return_date
+    params['tt'] = '0' if flight_data.return_date else '1'
+    params['sc'] = config.cabin_codes[flight_data.cabinType]
+    params['px'] = ','.join(str(count) for count in passengers)
+    params.update(config.extra_params)
+    return params
@@ -1,26 +1,136 @@
-from dataclasses import dataclass
+import asyncio
+from dataclasses import dataclass, field
+from enum import Enum
+import gzip
 from logging import Logger
+import os
+import random
+import re
+import time
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 from infrastructure.base_browser import BrowserClient
+from infrastructure.config_browser import RetryConfig
+
+
+class ErrorKind(Enum):
+    TRANSIENT = 'transient' # Worth retrying the step in the same page
+    BLOCKED = 'blocked' # Bot challenge or rate limit, the session and its proxy are burnt
+    FATAL = 'fatal' # Bad input or a broken page, retrying cannot help
+
+
+class BlockedError(Exception):
+    """
+    Raised when the site answers with a bot challenge or a blocking status.
+    """
+
+
+_TRANSIENT_MESSAGES = re.compile(
+    r'timeout|detached|not attached|execution context was destroyed|navigation|'
+    r'net::err_|ns_error_|connection (reset|refused|closed)',
+    re.IGNORECASE,
+)
+# Blocking statuses are raised as BlockedError by navigate(); a bare 403 in a
+# message may as well be a flight number or a price, so only explicit forms count
+_BLOCKED_MESSAGES = re.compile(
+    r'captcha|access denied|\b(?:status(?: code)?|http(?:/[\d.]+)?)[\s:=]*(?:403|429)\b',
+    re.IGNORECASE,
+)
+
+
+def classify(error: BaseException) -> ErrorKind:
+    """
+    Sorts an exception raised during a search into an ErrorKind.
+    """
+    if isinstance(error, BlockedError):
+        return ErrorKind.BLOCKED
+    if isinstance(error, (PlaywrightTimeoutError, asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return ErrorKind.TRANSIENT
+    if isinstance(error, ValueError):
+        return ErrorKind.FATAL
+    message = str(error)
+    if _BLOCKED_MESSAGES.search(message):
+        return ErrorKind.BLOCKED
+    if _TRANSIENT_MESSAGES.search(message):
+        return ErrorKind.TRANSIENT
+    return ErrorKind.FATAL
+
+
+def backoff_delay(config: RetryConfig, attempt: int) -> float:
+    """
+    Exponential backoff with full jitter for the given 1-based attempt.
+    """
+    return random.uniform(0, min(config.backoff_max, config.backoff_base * 2 ** (attempt - 1)))
 
 
 @dataclass
 class ErrorHandler:
+    """
+    Logs failed searches and keeps sampled evidence of them. Only grabbing the
+    screenshot and HTML waits on the page; compressing and writing run in a
+    background thread.
+    """
     logger: Logger
+    config: RetryConfig = field(default_factory=RetryConfig)
     error_count: int = 0
+    _pending: set = field(default_factory=set, init=False, repr=False)
 
-    async def handle_error(self, client: BrowserClient, error: Exception):
+    async def handle_error(self, client: BrowserClient, error: Exception) -> ErrorKind:
         self.error_count += 1
-        self.logger.error(f"Error occurred: {str(error)}")
-        await self._capture_evidence(client)
+        kind = classify(error)
+        self.logger.error("Error occurred (%s): %s", kind.value, error)
+        if client is not None and random.random() < self.config.evidence_rate:
+            await self._capture_evidence(client, kind)
+        return kind
+
+    async def drain(self) -> None:
+        """
+        Waits until evidence still being written has reached disk.
+        """
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    async def _capture_evidence(self, client: BrowserClient, kind: ErrorKind) -> None:
+        try:
+            screenshot, html = await asyncio.wait_for(
+                asyncio.gather(client.screenshot(type='jpeg', quality=50), client.content()),
+                timeout=self.config.evidence_timeout,
+            )
+        except Exception as e:
+            self.logger.warning("Could not capture evidence: %s", e)
+            return
+        name = f"{kind.value}-{int(time.time() * 1000)}-{self.error_count}"
+        task = asyncio.create_task(asyncio.to_thread(self._write_evidence, name, screenshot, html))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _write_evidence(self, name: str, screenshot: bytes, html: str) -> None:
+        os.makedirs(self.config.evidence_dir, exist_ok=True)
+        limit = self.config.evidence_max_bytes
+        path = os.path.join(self.config.evidence_dir, name)
+        with open(f"{path}.html.gz", 'wb') as file:
+            file.write(gzip.compress(html.encode('utf-8')[:limit], compresslevel=6))
+        if len(screenshot) <= limit:
+            with open(f"{path}.jpg", 'wb') as file:
+                file.write(screenshot)
+        self.logger.info("Saved evidence of the failure to %s.*", path)
 
 
 @dataclass
 class ConsoleLogger(Logger):
     name: str = "BrowserService"
-    
-    def info(self, message: str) -> None:
-        print(f"[INFO][{self.name}] {message}")
-    
-    def error(self, message: str) -> None:
-        print(f"[ERROR][{self.name}] {message}")
\ No newline at end of file
+    verbose: bool = False # Print debug messages too
+
+    def debug(self, message: str, *args) -> None:
+        if self.verbose:
+            print(f"[DEBUG][{self.name}] {message % args if args else message}")
+
+    def info(self, message: str, *args) -> None:
+        print(f"[INFO][{self.name}] {message % args if args else message}")
+
+    def warning(self, message: str, *args) -> None:
+        print(f"[WARNING][{self.name}] {message % args if args else message}")
+
+    def error(self, message: str, *args) -> None:
+        print(f"[ERROR][{self.name}] {message % args if args else message}")
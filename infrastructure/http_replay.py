@@ -0,0 +1,254 @@
+import asyncio
+import copy
+from dataclasses import dataclass, field
+import json
+from logging import Logger
+import re
+import time
+from typing import Any, Optional
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+
+from infrastructure.browser import BrowserManager
+from infrastructure.config_browser import DeepLinkConfig, InterceptConfig, ReplayConfig
+from infrastructure.deep_link import build_results_url, results_params
+from infrastructure.schemas.search import FlightSearchRequest
+
+
+class ReplayRejected(Exception):
+    """
+    The shopping API refused a replayed request: the tokens expired or the
+    client was challenged.
+    """
+
+
+class ReplayMismatch(ReplayRejected):
+    """
+    The shopping API answered a replayed request with trips for another
+    route or date than the search asked for.
+    """
+
+
+@dataclass
+class ReplayCredentials:
+    """
+    The shopping API request a real results page made, and the cookies of
+    the browser context that made it.
+    """
+    api_url: str
+    method: str
+    headers: dict[str, str]
+    body: dict[str, Any] # JSON body of the request, the template for replayed searches
+    storage_state: dict[str, Any]
+    harvested_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class TokenHarvester:
+    """
+    Loads a results page in a pooled browser and records the shopping API
+    request it makes.
+    """
+    launcher: BrowserManager
+    deep_link: DeepLinkConfig
+    intercept: InterceptConfig
+    config: ReplayConfig
+    logger: Logger
+
+    async def harvest(self, flight_data: FlightSearchRequest) -> ReplayCredentials:
+        pattern = re.compile(self.intercept.url_pattern)
+        lease = await self.launcher.launch()
+        discard = True
+        try:
+            page = lease.page
+            async with page.expect_request(
+                lambda request: bool(pattern.search(request.url)), timeout=self.config.harvest_timeout
+            ) as captured:
+                await page.goto(build_results_url(flight_data, self.deep_link))
+            request = await captured.value
+            headers = {
+                name: value for name, value in (await request.all_headers()).items()
+                if not name.startswith(':') and name.lower() not in self.config.skip_headers
+            }
+            body = json.loads(request.post_data) if request.post_data else {}
+            storage_state = await lease.context.storage_state()
+            discard = False
+        finally:
+            await self.launcher.release(lease, discard=discard)
+        self.logger.info("Harvested %s headers and %s cookies for replay", len(headers), len(storage_state.get('cookies', [])))
+        return ReplayCredentials(request.url, request.method, headers, body if isinstance(body, dict) else {}, storage_state)
+
+
+@dataclass
+class ReplayClient:
+    """
+    Replays the shopping API request for new searches over one pooled HTTP
+    client that carries the harvested cookies. Credentials are harvested on
+    first use, again after `harvest_interval`, and after a rejection. Searches
+    that need credentials meanwhile share one harvest; after a failed harvest
+    the client reports itself unavailable for `harvest_cooldown`.
+    """
+    launcher: BrowserManager
+    harvester: TokenHarvester
+    deep_link: DeepLinkConfig
+    config: ReplayConfig
+    logger: Logger
+    harvests: int = 0
+    _credentials: Optional[ReplayCredentials] = field(default=None, init=False)
+    _api: Optional[Any] = field(default=None, init=False)
+    _harvesting: Optional[asyncio.Task] = field(default=None, init=False, repr=False)
+    _harvest_failed_at: Optional[float] = field(default=None, init=False)
+    _retired: set = field(default_factory=set, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._slots = asyncio.Semaphore(self.config.max_in_flight)
+
+    @property
+    def available(self) -> bool:
+        """
+        False while cooling down from a failed harvest.
+        """
+        failed_at = self._harvest_failed_at
+        return failed_at is None or time.monotonic() - failed_at >= self.config.harvest_cooldown
+
+    async def fetch(self, flight_data: FlightSearchRequest) -> dict[str, Any]:
+        """
+        Returns the shopping API payload for `flight_data`. Raises
+        ReplayRejected, and drops the credentials, when the API refuses it.
+        """
+        params = results_params(flight_data, self.deep_link)
+        credentials, api = await self._session(flight_data)
+        async with self._slots:
+            if credentials.method == 'GET':
+                url = urlsplit(credentials.api_url)
+                query = self._with_params(dict(parse_qsl(url.query)), params)
+                response = await api.get(
+                    urlunsplit(url._replace(query='')), params=query, headers=credentials.headers, timeout=self.config.timeout
+                )
+            else:
+                response = await api.fetch(
+                    credentials.api_url,
+                    method=credentials.method,
+                    data=json.dumps(self._with_params(credentials.body, params)),
+                    headers=credentials.headers,
+                    timeout=self.config.timeout,
+                )
+        payload = await self._read_payload(response, credentials)
+        self._check_trips(payload, params)
+        return payload
+
+    async def _read_payload(self, response: Any, credentials: ReplayCredentials) -> dict[str, Any]:
+        try:
+            if response.status in self.config.rejected_statuses or not response.ok:
+                raise ReplayRejected(f"Shopping API answered {response.status}")
+            try:
+                payload = await response.json()
+            except Exception:
+                raise ReplayRejected("Shopping API answered with something other than JSON, likely a challenge")
+            if not isinstance(payload, dict) or 'data' not in payload:
+                raise ReplayRejected("Shopping API answered with an unexpected payload")
+            return payload
+        except ReplayRejected:
+            self._invalidate(credentials)
+            raise
+        finally:
+            await response.dispose()
+
+    async def close(self) -> None:
+        harvesting, self._harvesting = self._harvesting, None
+        if harvesting is not None:
+            harvesting.cancel()
+            await asyncio.gather(harvesting, return_exceptions=True)
+        self._credentials = None
+        api, self._api = self._api, None
+        if api is not None:
+            await api.dispose()
+
+    def _with_params(self, template: dict[str, Any], params: dict[str, str]) -> dict[str, Any]:
+        """
+        The harvested request with the search parameters written to the
+        fields `request_fields` maps them to.
+        """
+        if not self.config.request_fields:
+            return {**template, **params}
+        request = copy.deepcopy(template)
+        for param, path in self.config.request_fields.items():
+            if param not in params:
+                continue
+            *parents, leaf = path.split('.')
+            node: Any = request
+            for key in parents:
+                node = node[int(key)] if isinstance(node, list) else node.setdefault(key, {})
+            if isinstance(node, list):
+                node[int(leaf)] = params[param]
+            else:
+                node[leaf] = params[param]
+        return request
+
+    def _check_trips(self, payload: dict[str, Any], params: dict[str, str]) -> None:
+        """
+        Raises ReplayMismatch unless the first trip of the answer is for the
+        route and date that were sent.
+        """
+        trips = (payload.get('data') or {}).get('Trips') or []
+        if not trips:
+            return
+        trip = trips[0]
+        expected = (
+            (self.config.trip_origin, params['f']),
+            (self.config.trip_destination, params['t']),
+            (self.config.trip_date, params['d']),
+        )
+        for name, value in expected:
+            answered = trip.get(name)
+            if answered is None or not str(answered).casefold().startswith(value.casefold()):
+                raise ReplayMismatch(f"Shopping API answered {name}={answered!r} for a search with {value!r}")
+
+    def _invalidate(self, credentials: ReplayCredentials) -> None:
+        # a rejection of older credentials must not throw away fresher ones
+        if self._credentials is credentials:
+            self._credentials = None
+
+    async def _session(self, flight_data: FlightSearchRequest) -> tuple[ReplayCredentials, Any]:
+        credentials = self._credentials
+        if credentials is not None and time.monotonic() - credentials.harvested_at <= self.config.harvest_interval:
+            return credentials, self._api
+        if not self.available:
+            raise ReplayRejected("Harvesting failed recently, not retrying yet")
+        if self._harvesting is None:
+            self._harvesting = asyncio.create_task(self._harvest(flight_data))
+            self._harvesting.add_done_callback(self._harvest_done)
+        # shielded so a cancelled search does not cancel the harvest the others wait on
+        return await asyncio.shield(self._harvesting)
+
+    async def _harvest(self, flight_data: FlightSearchRequest) -> tuple[ReplayCredentials, Any]:
+        try:
+            credentials = await self.harvester.harvest(flight_data)
+            api = await self.launcher.new_request_context(storage_state=credentials.storage_state)
+        except Exception:
+            self._harvest_failed_at = time.monotonic()
+            raise
+        if self._api is not None:
+            self._retire(self._api)
+        self._credentials, self._api = credentials, api
+        self._harvest_failed_at = None
+        self.harvests += 1
+        return credentials, api
+
+    def _harvest_done(self, task: asyncio.Task) -> None:
+        if self._harvesting is task:
+            self._harvesting = None
+        if not task.cancelled():
+            # retrieved here so a failure nobody awaited is not reported as unhandled
+            task.exception()
+
+    def _retire(self, api: Any) -> None:
+        """
+        Disposes a replaced client once requests still using it have had time to finish.
+        """
+        async def dispose() -> None:
+            await asyncio.sleep(self.config.timeout / 1000)
+            await api.dispose()
+
+        task = asyncio.create_task(dispose())
+        self._retired.add(task)
+        task.add_done_callback(self._retired.discard)
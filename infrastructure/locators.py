@@ -0,0 +1,120 @@
+from collections import Counter
+from dataclasses import dataclass, field
+import time
+from typing import Any, Optional
+
+from infrastructure.base_browser import BrowserClient
+from infrastructure.config_browser import SelectorConfig
+from infrastructure.metrics import NullTracer, Tracer
+
+
+@dataclass
+class SelectorTiming:
+    """
+    Resolve statistics of one SelectorConfig entry.
+    """
+    resolves: int = 0
+    probed: int = 0 # Resolves that had to try several candidates
+    seconds: float = 0.0 # Time spent waiting for the entry to appear
+    misses: int = 0 # Resolves where no candidate showed up in time
+    fallbacks: int = 0 # Probes won by a candidate other than the preferred first one
+    matched: Counter = field(default_factory=Counter) # Winning candidate selector -> times
+
+
+@dataclass
+class SelectorProfile:
+    """
+    Shared by every LocatorRegistry, so it shows across searches which
+    selectors are slow to resolve and how often the preferred one misses.
+    """
+    timings: dict[str, SelectorTiming] = field(default_factory=dict)
+
+    def record(self, name: str, candidates: list[str], index: Optional[int], seconds: float) -> None:
+        timing = self.timings.setdefault(name, SelectorTiming())
+        timing.resolves += 1
+        timing.seconds += seconds
+        timing.probed += len(candidates) > 1
+        if index is None:
+            timing.misses += 1
+            return
+        timing.fallbacks += index > 0
+        timing.matched[candidates[index]] += 1
+
+    def report(self) -> list[dict[str, Any]]:
+        """
+        One entry per selector name, slowest total resolve time first.
+        """
+        return [
+            {
+                'name': name,
+                'resolves': timing.resolves,
+                'resolve_ms': round(timing.seconds / timing.resolves * 1000, 2) if timing.resolves else 0.0,
+                'fallbacks': timing.fallbacks,
+                'misses': timing.misses,
+                'matched': dict(timing.matched),
+            }
+            for name, timing in sorted(self.timings.items(), key=lambda item: item[1].seconds, reverse=True)
+        ]
+
+
+@dataclass
+class LocatorRegistry:
+    """
+    Resolves SelectorConfig entries to Locators once per page. Entries with
+    several candidates (`SelectorConfig.fallbacks`) wait for whichever
+    appears first and keep the earliest candidate that matched; entries with
+    a single selector wait for it alone, so slow selectors show up in the
+    profile either way.
+    """
+    client: BrowserClient
+    selectors: SelectorConfig
+    profile: SelectorProfile = field(default_factory=SelectorProfile)
+    tracer: Tracer = field(default_factory=NullTracer)
+    _cache: dict[tuple, tuple[str, Any]] = field(default_factory=dict, init=False)
+
+    async def selector(self, name: str, **params: str) -> str:
+        """
+        The selector chosen for `name`, with `params` filled into its template.
+        """
+        return (await self._resolve(name, None, params))[0]
+
+    async def locator(self, name: str, parent: Optional[str] = None, **params: str) -> Any:
+        """
+        The cached Locator for `name`, searched inside the `parent` entry
+        when given. `params` fill the templates of both.
+        """
+        return (await self._resolve(name, parent, params))[1]
+
+    async def _resolve(self, name: str, parent: Optional[str], params: dict[str, str]) -> tuple[str, Any]:
+        key = (name, parent, tuple(sorted(params.items())))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        scope = self.client if parent is None else await self.locator(parent, **params)
+        candidates = self.selectors.candidates(name, **params)
+        started = time.perf_counter()
+        with self.tracer.span('resolve', selector=name):
+            index = await self._first_attached(scope, candidates)
+        self.profile.record(name, candidates, index, time.perf_counter() - started)
+        if index is None:
+            # nothing showed up in time: let the action wait on the last, most tolerant selector
+            return candidates[-1], scope.locator(candidates[-1])
+        entry = candidates[index], scope.locator(candidates[index])
+        self._cache[key] = entry
+        return entry
+
+    async def _first_attached(self, scope: Any, candidates: list[str]) -> Optional[int]:
+        locators = [scope.locator(candidate) for candidate in candidates]
+        any_of = locators[0]
+        for locator in locators[1:]:
+            any_of = any_of.or_(locator)
+        try:
+            await any_of.first.wait_for(state='attached', timeout=self.selectors.resolve_timeout)
+        except Exception:
+            return None
+        if len(locators) == 1:
+            return 0
+        for index, locator in enumerate(locators):
+            if await locator.count():
+                return index
+        return None
@@ -0,0 +1,161 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import itertools
+import json
+import os
+import time
+from typing import Any, Optional
+
+from infrastructure.config_browser import MetricsConfig
+
+
+# Upper bounds in seconds, from a quick selector lookup to a whole search
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+@dataclass
+class Histogram:
+    counts: list[int] = field(default_factory=lambda: [0] * (len(BUCKETS) + 1))
+    total: float = 0.0
+    count: int = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+
+@dataclass
+class SpanRecord:
+    name: str
+    labels: dict[str, str]
+    span_id: int
+    parent_id: Optional[int]
+    root_id: int
+    start: float
+    duration: float
+
+
+class _NullSpan:
+    def __enter__(self) -> '_NullSpan':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+# (span id, root span id) of the innermost open span in this task
+_current_span: ContextVar[Optional[tuple[int, int]]] = ContextVar('current_span', default=None)
+
+
+class Tracer(ABC):
+    """
+    An abstract base class for timing nested steps of a search.
+    """
+    @abstractmethod
+    def span(self, name: str, **labels: str) -> Any: ...
+
+
+class NullTracer(Tracer):
+    """
+    Records nothing; every span is the same shared no-op context manager.
+    """
+    def span(self, name: str, **labels: str) -> _NullSpan:
+        return _NULL_SPAN
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'labels', 'span_id', 'parent_id', 'root_id', 'start', 'token')
+
+    def __init__(self, tracer: 'RecordingTracer', name: str, labels: dict[str, str]) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self) -> '_Span':
+        self.span_id = next(self.tracer._ids)
+        parent = _current_span.get()
+        self.parent_id, self.root_id = parent if parent else (None, self.span_id)
+        self.token = _current_span.set((self.span_id, self.root_id))
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        duration = time.perf_counter() - self.start
+        _current_span.reset(self.token)
+        self.tracer._finish(SpanRecord(
+            self.name, self.labels, self.span_id, self.parent_id, self.root_id, self.start, duration
+        ))
+
+
+@dataclass
+class RecordingTracer(Tracer):
+    """
+    Keeps the most recent spans for a JSON trace and aggregates every span into
+    a latency histogram per step name and labels.
+    """
+    max_spans: int = 10000
+    histograms: dict[tuple, Histogram] = field(default_factory=dict, init=False)
+
+    def __post_init__(self) -> None:
+        self.spans: deque[SpanRecord] = deque(maxlen=self.max_spans)
+        self._ids = itertools.count(1)
+        self._origin = time.perf_counter()
+
+    def span(self, name: str, **labels: str) -> _Span:
+        return _Span(self, name, labels)
+
+    def _finish(self, record: SpanRecord) -> None:
+        self.spans.append(record)
+        key = (record.name, tuple(sorted(record.labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(record.duration)
+
+    def export_prometheus(self, metric: str = 'flight_search_step_seconds') -> str:
+        """
+        Renders the histograms in the Prometheus text exposition format.
+        """
+        lines = [f'# HELP {metric} Time spent per search step.', f'# TYPE {metric} histogram']
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            base = ','.join([f'step="{_escape(name)}"'] + [f'{key}="{_escape(value)}"' for key, value in labels])
+            cumulative = 0
+            for bound, count in zip(BUCKETS + (float('inf'),), histogram.counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{metric}_bucket{{{base},le="{le}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{{base}}} {histogram.total}')
+            lines.append(f'{metric}_count{{{base}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def export_trace(self, path: str) -> None:
+        """
+        Writes the recorded spans as a Chrome trace (chrome://tracing, Perfetto).
+        """
+        events = [
+            {
+                'name': record.name,
+                'ph': 'X',
+                'ts': round((record.start - self._origin) * 1e6),
+                'dur': round(record.duration * 1e6),
+                'pid': os.getpid(),
+                'tid': record.root_id,
+                'args': dict(record.labels, span_id=record.span_id, parent_id=record.parent_id),
+            }
+            for record in self.spans
+        ]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events}, f)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def build_tracer(config: MetricsConfig) -> Tracer:
+    return RecordingTracer(max_spans=config.max_spans) if config.enabled else NullTracer()
@@ -0,0 +1,95 @@
+import asyncio
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+import random
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+from infrastructure.config_browser import PacingConfig
+
+
+@dataclass
+class OriginRateLimiter:
+    """
+    A token bucket per origin shared by every session, so pacing towards a host
+    holds across concurrent searches rather than per click.
+    """
+    rate: float # Tokens added per second
+    burst: int # Bucket size
+    _buckets: dict[str, tuple[float, float]] = field(default_factory=dict, init=False)
+
+    async def acquire(self, origin: str) -> float:
+        """
+        Takes one token for the origin, sleeping until one is available.
+        Returns the seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(origin, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                self._buckets[origin] = (tokens - 1, now)
+                return waited
+            self._buckets[origin] = (tokens, now)
+            delay = (1 - tokens) / self.rate
+            await asyncio.sleep(delay)
+            waited += delay
+
+
+class Pacer(ABC):
+    """
+    An abstract base class deciding the deliberate delays between page actions.
+    """
+    limiter: Optional[OriginRateLimiter] = None
+
+    @abstractmethod
+    def delay(self, min_ms: int, max_ms: int) -> float:
+        """
+        Returns the seconds to pause after an action allowed to take min_ms..max_ms.
+        """
+
+    async def throttle(self, url: str) -> float:
+        """
+        Waits for the shared per-origin budget before a request-triggering action.
+        """
+        if self.limiter is None:
+            return 0.0
+        parts = urlsplit(url)
+        return await self.limiter.acquire(f'{parts.scheme}://{parts.netloc}')
+
+
+@dataclass
+class NoDelayPacer(Pacer):
+    """
+    Skips per-action pauses, for deep-link and offline runs.
+    """
+    limiter: Optional[OriginRateLimiter] = None
+
+    def delay(self, min_ms: int, max_ms: int) -> float:
+        return 0.0
+
+
+@dataclass
+class HumanPacer(Pacer):
+    """
+    Uniform random pauses in the requested range. Seed it for reproducible runs.
+    """
+    seed: Optional[int] = None
+    limiter: Optional[OriginRateLimiter] = None
+
+    def __post_init__(self) -> None:
+        self._random = random.Random(self.seed)
+
+    def delay(self, min_ms: int, max_ms: int) -> float:
+        return self._random.randint(min_ms, max_ms) / 1000
+
+
+def build_pacer(config: PacingConfig) -> Pacer:
+    limiter = OriginRateLimiter(config.origin_rate, config.origin_burst) if config.origin_rate > 0 else None
+    if config.profile == 'fast':
+        return NoDelayPacer(limiter=limiter)
+    if config.profile == 'human':
+        return HumanPacer(seed=config.seed, limiter=limiter)
+    raise ValueError(f'Unknown pacing profile: {config.profile}')
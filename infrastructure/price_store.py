@@ -0,0 +1,232 @@
+import asyncio
+from dataclasses import dataclass, field
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterable, Optional
+
+from domain.entities.flight import Flight
+from infrastructure.schemas.search import FlightSearchRequest
+
+
+_FLIGHT_NUMBER = re.compile(r'\b([A-Z0-9]{2})\s?(\d{1,4})\b')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    id INTEGER PRIMARY KEY,
+    origin TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    travel_date TEXT NOT NULL,
+    cabin TEXT NOT NULL,
+    flight_key TEXT NOT NULL,
+    airline TEXT,
+    departure TEXT,
+    arrival TEXT,
+    duration_minutes INTEGER,
+    stops INTEGER,
+    price_minor INTEGER,
+    currency TEXT,
+    scraped_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS prices_by_flight
+    ON prices (origin, destination, travel_date, cabin, flight_key, scraped_at);
+
+CREATE TABLE IF NOT EXISTS latest_prices (
+    origin TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    travel_date TEXT NOT NULL,
+    cabin TEXT NOT NULL,
+    flight_key TEXT NOT NULL,
+    airline TEXT,
+    departure TEXT,
+    arrival TEXT,
+    duration_minutes INTEGER,
+    stops INTEGER,
+    price_minor INTEGER,
+    currency TEXT,
+    scraped_at REAL NOT NULL,
+    PRIMARY KEY (origin, destination, travel_date, cabin, flight_key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS latest_prices_by_price
+    ON latest_prices (origin, destination, travel_date, cabin, price_minor);
+"""
+
+_COLUMNS = (
+    'flight_key', 'airline', 'departure', 'arrival', 'duration_minutes', 'stops', 'price_minor', 'currency', 'scraped_at'
+)
+
+
+def flight_key(flight: Flight) -> str:
+    """
+    Identifies a flight across scrapes: the flight number when the airline
+    label carries one, e.g. "UA 123 (Boeing 787)", otherwise the airline
+    with its departure and arrival times.
+    """
+    match = _FLIGHT_NUMBER.search(flight.airline or '')
+    if match is not None:
+        return f'{match[1]}{match[2]}'
+    return f'{flight.airline or ""}@{flight.departure or ""}-{flight.arrival or ""}'
+
+
+@dataclass
+class PriceRecord:
+    flight_key: str
+    airline: Optional[str]
+    departure: Optional[str]
+    arrival: Optional[str]
+    duration_minutes: Optional[int]
+    stops: Optional[int]
+    price_minor: Optional[int]
+    currency: Optional[str]
+    scraped_at: float
+
+
+@dataclass
+class PriceStore:
+    """
+    A SQLite price history. `prices` keeps one row per observed price change
+    of a flight; `latest_prices` keeps a copy of the newest row of each
+    flight and is what change detection and the cheapest-flights query read.
+    Queries run on a worker thread, one at a time over a single connection.
+    """
+    path: str
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(_SCHEMA)
+
+    async def record(
+        self,
+        request: FlightSearchRequest,
+        flights: Iterable[Flight],
+        scraped_at: Optional[float] = None
+    ) -> int:
+        """
+        Stores the flights of one search, writing a history row only for
+        flights that are new or whose price changed. Returns the rows written.
+        """
+        route = self._route(request.departure, request.arrival, request.departure_date, request.cabinType)
+        rows = [self._row(flight, scraped_at or time.time()) for flight in flights]
+        return await asyncio.to_thread(self._record, route, rows)
+
+    async def record_many(self, results: Iterable[tuple[FlightSearchRequest, list[Flight]]]) -> int:
+        """
+        Stores several searches in one transaction.
+        """
+        scraped_at = time.time()
+        batches = [
+            (
+                self._route(request.departure, request.arrival, request.departure_date, request.cabinType),
+                [self._row(flight, scraped_at) for flight in flights],
+            )
+            for request, flights in results
+        ]
+        return await asyncio.to_thread(self._record_batches, batches)
+
+    async def cheapest(
+        self,
+        origin: str,
+        destination: str,
+        travel_date: str,
+        cabin: str = 'economy',
+        limit: int = 10
+    ) -> list[PriceRecord]:
+        """
+        The currently cheapest flights for a route and date.
+        """
+        query = f"""
+            SELECT {', '.join(_COLUMNS)}
+            FROM latest_prices
+            WHERE origin = ? AND destination = ? AND travel_date = ? AND cabin = ? AND price_minor IS NOT NULL
+            ORDER BY price_minor
+            LIMIT ?
+        """
+        route = self._route(origin, destination, travel_date, cabin)
+        return await asyncio.to_thread(self._select, query, (*route, limit))
+
+    async def history(
+        self,
+        origin: str,
+        destination: str,
+        travel_date: str,
+        flight_key: str,
+        cabin: str = 'economy'
+    ) -> list[PriceRecord]:
+        """
+        Every recorded price change of one flight, oldest first.
+        """
+        query = f"""
+            SELECT {', '.join(_COLUMNS)}
+            FROM prices
+            WHERE origin = ? AND destination = ? AND travel_date = ? AND cabin = ? AND flight_key = ?
+            ORDER BY scraped_at
+        """
+        route = self._route(origin, destination, travel_date, cabin)
+        return await asyncio.to_thread(self._select, query, (*route, flight_key))
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _record(self, route: tuple, rows: list[tuple]) -> int:
+        return self._record_batches([(route, rows)])
+
+    def _record_batches(self, batches: list[tuple[tuple, list[tuple]]]) -> int:
+        written = 0
+        with self._lock, self._connection:
+            for route, rows in batches:
+                written += self._write_changes(route, rows)
+        return written
+
+    def _write_changes(self, route: tuple, rows: list[tuple]) -> int:
+        latest = dict(self._connection.execute(
+            'SELECT flight_key, price_minor FROM latest_prices'
+            ' WHERE origin = ? AND destination = ? AND travel_date = ? AND cabin = ?',
+            route,
+        ).fetchall())
+        # the cheapest fare wins when a page lists the same flight twice
+        cheapest: dict[str, tuple] = {}
+        for row in rows:
+            seen = cheapest.get(row[0])
+            if seen is None or (row[6] is not None and (seen[6] is None or row[6] < seen[6])):
+                cheapest[row[0]] = row
+        rows = [(*route, *row) for key, row in cheapest.items() if key not in latest or latest[key] != row[6]]
+        if not rows:
+            return 0
+        columns = f"origin, destination, travel_date, cabin, {', '.join(_COLUMNS)}"
+        placeholders = ', '.join('?' * (len(_COLUMNS) + 4))
+        self._connection.executemany(f'INSERT INTO prices ({columns}) VALUES ({placeholders})', rows)
+        self._connection.executemany(f'INSERT OR REPLACE INTO latest_prices ({columns}) VALUES ({placeholders})', rows)
+        return len(rows)
+
+    def _select(self, query: str, params: tuple) -> list[PriceRecord]:
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return [PriceRecord(*row) for row in rows]
+
+    @staticmethod
+    def _route(origin: str, destination: str, travel_date: str, cabin: str) -> tuple[str, str, str, str]:
+        return (
+            origin.strip().casefold(),
+            destination.strip().casefold(),
+            travel_date or '',
+            (cabin or 'economy').strip().casefold(),
+        )
+
+    @staticmethod
+    def _row(flight: Flight, scraped_at: float) -> tuple:
+        return (
+            flight_key(flight),
+            flight.airline,
+            flight.departure,
+            flight.arrival,
+            flight.duration_minutes,
+            flight.stops,
+            flight.price_minor,
+            flight.currency,
+            scraped_at,
+        )
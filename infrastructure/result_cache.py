@@ -0,0 +1,120 @@
+import asyncio
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+from domain.entities.flight import Flight
+
+
+@dataclass
+class CacheEntry:
+    flights: list[Flight]
+    stored_at: float = field(default_factory=time.time)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+
+class ResultCache(ABC):
+    """
+    An abstract base class for flight search result caches.
+    """
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CacheEntry]: ...
+
+    @abstractmethod
+    async def set(self, key: str, flights: list[Flight]) -> None: ...
+
+
+@dataclass
+class MemoryResultCache(ResultCache):
+    """
+    An in-memory cache bounded by entry count with least recently used eviction.
+    Entries older than `max_age` seconds are dropped on access.
+    """
+    max_entries: int
+    max_age: float
+    evictions: int = 0
+    _entries: OrderedDict[str, CacheEntry] = field(default_factory=OrderedDict, init=False)
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.age > self.max_age:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, flights: list[Flight]) -> None:
+        self._store(key, CacheEntry(list(flights)))
+
+    def _store(self, key: str, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+@dataclass
+class DiskResultCache(MemoryResultCache):
+    """
+    A memory cache backed by one JSON file per entry, so results survive restarts.
+    Files are touched on read and the least recently used are pruned beyond
+    `max_entries`.
+    """
+    directory: str = '.flight_cache'
+
+    def __post_init__(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        entry = await super().get(key)
+        if entry is not None:
+            return entry
+        entry = await asyncio.to_thread(self._read, key)
+        if entry is not None:
+            self._store(key, entry)
+        return entry
+
+    async def set(self, key: str, flights: list[Flight]) -> None:
+        entry = CacheEntry(list(flights))
+        self._store(key, entry)
+        await asyncio.to_thread(self._write, key, entry)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + '.json')
+
+    def _read(self, key: str) -> Optional[CacheEntry]:
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        entry = CacheEntry([Flight(**flight) for flight in data['flights']], data['stored_at'])
+        if entry.age > self.max_age:
+            os.remove(path)
+            return None
+        os.utime(path)
+        return entry
+
+    def _write(self, key: str, entry: CacheEntry) -> None:
+        path = self._path(key)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'stored_at': entry.stored_at, 'flights': [asdict(flight) for flight in entry.flights]}, f)
+        os.replace(path + '.tmp', path)
+        files = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith('.json')]
+        if len(files) > self.max_entries:
+            files.sort(key=os.path.getmtime)
+            for stale in files[:len(files) - self.max_entries]:
+                os.remove(stale)
+                self.evictions += 1
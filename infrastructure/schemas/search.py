@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 
 
 @dataclass
@@ -18,6 +18,25 @@ class FlightSearchRequest:
     return_date: str = None
     cabinType: str = 'economy'
 
+    @classmethod
+    def from_dict(cls, data: dict) -> 'FlightSearchRequest':
+        """
+        Builds a request from decoded JSON, e.g. a daemon request body.
+        """
+        try:
+            passengers = [Passenger(category=str(p['category']), count=int(p['count'])) for p in data['passengers']]
+            return cls(
+                url=str(data['url']),
+                departure=str(data['departure']),
+                arrival=str(data['arrival']),
+                departure_date=str(data['departure_date']),
+                passengers=passengers,
+                return_date=data.get('return_date'),
+                cabinType=str(data.get('cabinType', 'economy')),
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid flight search request: {e!r}") from e
+
     def _formate_date(self, date: str) -> tuple[str, str, int]:
         """
         Format the date to 'YYYY-MM-DD' format.
@@ -31,3 +50,68 @@ class FlightSearchRequest:
         except ValueError:
             raise ValueError("Invalid date format. Use DD-MM-YYYY")
 
+    def cache_key(self) -> str:
+        """
+        A key that is equal for requests asking for the same search, regardless
+        of city casing, surrounding whitespace or passenger order.
+        """
+        passengers: dict[str, int] = {}
+        for passenger in self.passengers:
+            category = passenger.category.strip().casefold()
+            passengers[category] = passengers.get(category, 0) + passenger.count
+        return '|'.join((
+            self.url.strip().rstrip('/').casefold(),
+            self.departure.strip().casefold(),
+            self.arrival.strip().casefold(),
+            self.departure_date or '',
+            self.return_date or '',
+            ','.join(f'{category}={count}' for category, count in sorted(passengers.items()) if count),
+            self.cabinType.strip().casefold(),
+        ))
+
+
+@dataclass
+class SweepRequest:
+    """
+    Searches every route on every date within `window_days` of `center_date`.
+    """
+    url: str
+    routes: list[tuple[str, str]]
+    center_date: str
+    passengers: list[Passenger]
+    window_days: int = 3
+    cabinType: str = 'economy'
+
+    def __post_init__(self) -> None:
+        # routes decoded from JSON arrive as lists; routes differing only in
+        # casing or whitespace are one search and share one matrix row
+        routes: dict[tuple[str, str], tuple[str, str]] = {}
+        for departure, arrival in self.routes:
+            route = (str(departure).strip(), str(arrival).strip())
+            routes.setdefault((route[0].casefold(), route[1].casefold()), route)
+        self.routes = list(routes.values())
+
+    def dates(self) -> list[str]:
+        center = datetime.strptime(self.center_date, "%Y-%m-%d")
+        return [
+            (center + timedelta(days=offset)).strftime("%Y-%m-%d")
+            for offset in range(-self.window_days, self.window_days + 1)
+        ]
+
+    def plan(self) -> list[FlightSearchRequest]:
+        """
+        One-way requests for every route and date, without duplicates.
+        """
+        planned: dict[str, FlightSearchRequest] = {}
+        for departure, arrival in self.routes:
+            for date in self.dates():
+                request = FlightSearchRequest(
+                    url=self.url,
+                    departure=departure,
+                    arrival=arrival,
+                    departure_date=date,
+                    passengers=list(self.passengers),
+                    cabinType=self.cabinType,
+                )
+                planned.setdefault(request.cache_key(), request)
+        return list(planned.values())
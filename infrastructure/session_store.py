@@ -0,0 +1,158 @@
+from dataclasses import dataclass, field
+import json
+import os
+import re
+import time
+from typing import Any, Optional
+
+from infrastructure.config_browser import SessionConfig
+
+
+@dataclass
+class Identity:
+    """
+    A proxy (or the browser's own connection) whose cookies and localStorage
+    are saved and restored together.
+    """
+    key: str
+    proxy: Optional[str] = None
+    uses: int = 0 # Searches served from the current saved state
+    saved_at: float = 0.0 # Wall time the state file was last written, 0 when there is none
+    quarantined_until: float = 0.0 # Monotonic time until which the identity is not handed out
+
+
+@dataclass
+class SessionStats:
+    """
+    How often a search started from saved state and how much faster it ran.
+    Time saved is estimated from the mean duration of cold searches.
+    """
+    warm: int = 0
+    cold: int = 0
+    warm_seconds: float = 0.0
+    cold_seconds: float = 0.0
+
+    @property
+    def time_saved(self) -> float:
+        if not self.warm or not self.cold:
+            return 0.0
+        return max(0.0, self.cold_seconds / self.cold * self.warm - self.warm_seconds)
+
+    def summary(self) -> str:
+        total = self.warm + self.cold
+        share = self.warm / total * 100 if total else 0.0
+        return f'{self.warm}/{total} searches reused warm state ({share:.0f}%), about {self.time_saved:.1f}s saved'
+
+
+@dataclass
+class SessionStore:
+    """
+    Saves and restores Playwright storage state per identity, rotating
+    identities across new contexts and expiring states that are too old or
+    have served too many searches.
+    """
+    config: SessionConfig
+    stats: SessionStats = field(default_factory=SessionStats)
+
+    def __post_init__(self) -> None:
+        proxies = self.config.identities or (None,)
+        self._identities = [Identity(self._key_for(proxy), proxy) for proxy in proxies]
+        self._next = 0
+        for identity in self._identities:
+            path = self.path_for(identity)
+            if os.path.exists(path):
+                identity.saved_at = os.path.getmtime(path)
+
+    def checkout(self) -> tuple[Identity, Optional[str]]:
+        """
+        Picks the next identity and returns it with the storage state file
+        to restore, or None when it has to warm up from scratch.
+        """
+        identity = self._next_identity()
+        if not self.config.enabled:
+            return identity, None
+        if identity.saved_at and self._expired(identity):
+            self.discard(identity)
+        if not identity.saved_at:
+            return identity, None
+        identity.uses += 1
+        return identity, self.path_for(identity)
+
+    def quarantine(self, identity: Identity) -> None:
+        """
+        Takes a blocked identity out of rotation and drops its saved state,
+        whose cookies are likely what got it flagged.
+        """
+        identity.quarantined_until = time.monotonic() + self.config.quarantine_seconds
+        self.discard(identity)
+
+    def has_alternative(self, identity: Identity) -> bool:
+        """
+        Whether another identity is currently in rotation to take over from
+        `identity`.
+        """
+        now = time.monotonic()
+        return any(other is not identity and other.quarantined_until <= now for other in self._identities)
+
+    def needs_save(self, identity: Identity) -> bool:
+        return self.config.enabled and time.time() - identity.saved_at >= self.config.save_interval
+
+    async def save(self, identity: Identity, context: Any) -> None:
+        """
+        Writes the context's cookies and localStorage, replacing the old file
+        atomically so concurrent restores never read a partial state.
+        """
+        os.makedirs(self.config.state_dir, exist_ok=True)
+        path = self.path_for(identity)
+        state = await context.storage_state()
+        temp_path = f'{path}.{os.getpid()}.{id(context)}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(state, file)
+        os.replace(temp_path, path)
+        if not identity.saved_at:
+            identity.uses = 0
+        identity.saved_at = time.time()
+
+    def discard(self, identity: Identity) -> None:
+        identity.saved_at = 0.0
+        identity.uses = 0
+        try:
+            os.remove(self.path_for(identity))
+        except FileNotFoundError:
+            pass
+
+    def record(self, warm: bool, seconds: float) -> None:
+        if warm:
+            self.stats.warm += 1
+            self.stats.warm_seconds += seconds
+        else:
+            self.stats.cold += 1
+            self.stats.cold_seconds += seconds
+
+    def path_for(self, identity: Identity) -> str:
+        return os.path.join(self.config.state_dir, f'{identity.key}.json')
+
+    def _next_identity(self) -> Identity:
+        """
+        Round robin over the identities that are not quarantined. When all of
+        them are, the one released soonest is used.
+        """
+        now = time.monotonic()
+        count = len(self._identities)
+        for offset in range(count):
+            identity = self._identities[(self._next + offset) % count]
+            if identity.quarantined_until <= now:
+                self._next += offset + 1
+                return identity
+        self._next += 1
+        return min(self._identities, key=lambda identity: identity.quarantined_until)
+
+    def _expired(self, identity: Identity) -> bool:
+        age = time.time() - identity.saved_at
+        return age > self.config.max_age or identity.uses >= self.config.max_uses
+
+    @staticmethod
+    def _key_for(proxy: Optional[str]) -> str:
+        if not proxy:
+            return 'direct'
+        return re.sub(r'[^A-Za-z0-9._-]+', '_', proxy).strip('_')
@@ -0,0 +1,32 @@
+from dataclasses import dataclass, field
+import json
+from typing import IO, Optional
+
+from domain.entities.flight import Flight
+
+
+@dataclass
+class NdjsonSink:
+    """
+    Writes one JSON object per line and flushes after each, so readers see
+    every flight as soon as it is parsed.
+    """
+    path: str
+    written: int = 0
+    _file: Optional[IO[str]] = field(default=None, init=False)
+
+    def __enter__(self) -> 'NdjsonSink':
+        self._file = open(self.path, 'w', encoding='utf-8')
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+
+    def write(self, flight: Flight) -> None:
+        if self._file is None:
+            raise RuntimeError("NdjsonSink is not open")
+        self._file.write(json.dumps(flight.to_dict(), ensure_ascii=False) + '\n')
+        self._file.flush()
+        self.written += 1
@@ -0,0 +1,161 @@
+import atexit
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from typing import Any, Iterator, Optional, TextIO
+import uuid
+
+from infrastructure.config_browser import LogConfig
+
+
+# Correlation id of the search the current task is running, set by correlation_scope
+correlation_id: ContextVar[Optional[str]] = ContextVar('correlation_id', default=None)
+
+_STOP = object()
+
+
+@contextmanager
+def correlation_scope(value: Optional[str] = None) -> Iterator[str]:
+    """
+    Tags every record logged inside the block, including from tasks started
+    in it, with one correlation id.
+    """
+    value = value or uuid.uuid4().hex[:12]
+    token = correlation_id.set(value)
+    try:
+        yield value
+    finally:
+        correlation_id.reset(token)
+
+
+@dataclass
+class _RepeatWindow:
+    started: float
+    count: int = 0
+    suppressed: int = 0
+
+
+@dataclass
+class StructuredLogger:
+    """
+    A Logger that only does work for enabled levels. Callers pass `%` style
+    arguments, which are formatted on a background thread along with the
+    JSON encoding and the writes, so logging never blocks the event loop.
+    Each message template is limited to `repeat_limit` records per window;
+    the rest are counted and reported with the next record that gets through.
+    Only the `repeat_templates` most recently seen templates are tracked.
+    """
+    config: LogConfig = field(default_factory=LogConfig)
+    name: str = "BrowserService"
+    stream: TextIO = field(default_factory=lambda: sys.stdout)
+    dropped: int = field(default=0, init=False) # Records lost because the queue was full
+
+    def __post_init__(self) -> None:
+        self._threshold = logging.getLevelName(self.config.level.upper())
+        self._queue: queue.Queue = queue.Queue(maxsize=self.config.queue_size)
+        self._windows: OrderedDict[str, _RepeatWindow] = OrderedDict()
+        self._windows_lock = threading.Lock() # Evidence writers log from worker threads
+        self._writer = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def debug(self, message: str, *args: Any) -> None:
+        if logging.DEBUG >= self._threshold:
+            self._log(logging.DEBUG, message, args)
+
+    def info(self, message: str, *args: Any) -> None:
+        if logging.INFO >= self._threshold:
+            self._log(logging.INFO, message, args)
+
+    def warning(self, message: str, *args: Any) -> None:
+        if logging.WARNING >= self._threshold:
+            self._log(logging.WARNING, message, args)
+
+    def error(self, message: str, *args: Any) -> None:
+        if logging.ERROR >= self._threshold:
+            self._log(logging.ERROR, message, args)
+
+    def close(self) -> None:
+        """
+        Writes out queued records and stops the writer thread.
+        """
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(timeout=5)
+
+    def _log(self, level: int, message: str, args: tuple) -> None:
+        suppressed = self._admit(message)
+        if suppressed is None:
+            return
+        record = (time.time(), level, message, args, correlation_id.get(), suppressed)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _admit(self, message: str) -> Optional[int]:
+        """
+        Returns None when the template is over its limit for the current
+        window, otherwise how many of its records were suppressed before.
+        """
+        if not self.config.repeat_limit:
+            return 0
+        now = time.monotonic()
+        with self._windows_lock:
+            window = self._windows.get(message)
+            if window is None or now - window.started >= self.config.repeat_window:
+                suppressed = window.suppressed if window else 0
+                self._windows[message] = _RepeatWindow(started=now, count=1)
+                self._windows.move_to_end(message)
+                while len(self._windows) > self.config.repeat_templates:
+                    self._windows.popitem(last=False)
+                return suppressed
+            self._windows.move_to_end(message)
+            if window.count >= self.config.repeat_limit:
+                window.suppressed += 1
+                return None
+            window.count += 1
+            return 0
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 256:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = _STOP in batch
+            lines = [self._format(record) for record in batch if record is not _STOP]
+            try:
+                if lines:
+                    self.stream.write(''.join(lines))
+                    self.stream.flush()
+            except (OSError, ValueError):
+                pass
+            if stop:
+                return
+
+    def _format(self, record: tuple) -> str:
+        created, level, message, args, search_id, suppressed = record
+        try:
+            text = message % args if args else message
+        except (TypeError, ValueError):
+            text = f"{message} {args!r}"
+        if suppressed:
+            text = f"{text} ({suppressed} similar messages suppressed)"
+        level_name = logging.getLevelName(level)
+        if self.config.format == 'json':
+            entry = {'ts': round(created, 6), 'level': level_name, 'logger': self.name, 'message': text}
+            if search_id:
+                entry['correlation_id'] = search_id
+            return json.dumps(entry, ensure_ascii=False, default=str) + '\n'
+        prefix = f"[{level_name}][{self.name}]" + (f"[{search_id}]" if search_id else '')
+        return f"{prefix} {text}\n"
@@ -0,0 +1,106 @@
+from collections import Counter
+from dataclasses import dataclass, field
+import re
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+from infrastructure.config_browser import ResourcePolicy
+
+
+@dataclass
+class TrafficStats:
+    """
+    Requests seen by one browser lease. Bytes are taken from the
+    Content-Length of responses, so they are the compressed transfer size.
+    """
+    allowed: int = 0
+    blocked: int = 0
+    bytes_received: int = 0
+    blocked_by: Counter = field(default_factory=Counter)
+
+    def summary(self) -> str:
+        reasons = ', '.join(f'{reason}={count}' for reason, count in self.blocked_by.most_common())
+        return (
+            f'{self.allowed} requests allowed, {self.blocked} blocked'
+            f'{f" ({reasons})" if reasons else ""}, {self.bytes_received} bytes received'
+        )
+
+
+@dataclass
+class TrafficMonitor:
+    """
+    Applies a ResourcePolicy through context routing and counts the traffic.
+    """
+    policy: ResourcePolicy
+    stats: TrafficStats = field(default_factory=TrafficStats)
+    page_host: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        self._allow = [re.compile(pattern) for pattern in self.policy.allow_url_patterns]
+        self._block = [re.compile(pattern) for pattern in self.policy.block_url_patterns]
+
+    @property
+    def routing(self) -> bool:
+        """
+        Whether requests go through context routing, which also turns off
+        the browser's HTTP cache for the context.
+        """
+        policy = self.policy
+        return policy.enabled and bool(
+            policy.block_resource_types or policy.block_url_patterns or policy.block_third_party
+        )
+
+    async def attach(self, context: Any) -> None:
+        context.on('response', self.on_response)
+        if self.routing:
+            await context.route('**/*', self.handle_route)
+        else:
+            # nothing is blocked, but the requests are still the baseline savings are measured against
+            context.on('request', self.on_request)
+
+    def reset(self) -> TrafficStats:
+        """
+        Starts counting a new lease and returns the stats of the previous one.
+        """
+        stats, self.stats = self.stats, TrafficStats()
+        self.page_host = None
+        return stats
+
+    async def handle_route(self, route: Any) -> None:
+        reason = self.block_reason(route.request)
+        if reason is None:
+            self.stats.allowed += 1
+            await route.continue_()
+        else:
+            self.stats.blocked += 1
+            self.stats.blocked_by[reason] += 1
+            await route.abort('blockedbyclient')
+
+    def block_reason(self, request: Any) -> Optional[str]:
+        url = request.url
+        host = urlsplit(url).hostname or ''
+        if request.is_navigation_request() and request.frame.parent_frame is None:
+            self.page_host = host
+            return None
+        if any(pattern.search(url) for pattern in self._allow):
+            return None
+        if request.resource_type in self.policy.block_resource_types:
+            return f'type:{request.resource_type}'
+        if any(pattern.search(url) for pattern in self._block):
+            return 'pattern'
+        if self.policy.block_third_party and not self._is_first_party(host):
+            return 'third-party'
+        return None
+
+    def on_request(self, request: Any) -> None:
+        self.stats.allowed += 1
+
+    def on_response(self, response: Any) -> None:
+        length = response.headers.get('content-length')
+        if length and length.isdigit():
+            self.stats.bytes_received += int(length)
+
+    def _is_first_party(self, host: str) -> bool:
+        if not self.page_host or host == self.page_host:
+            return True
+        return any(host == domain or host.endswith(f'.{domain}') for domain in self.policy.first_party_domains)
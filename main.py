@@ -1,14 +1,35 @@
+import argparse
 import asyncio
+from contextlib import aclosing
 import json
+from typing import Optional
 
+from application.daemon import SearchDaemon
+from application.providers.fan_out import FanOutSearch
+from application.usecases.cached_search import CachedFlightSearchUseCase
+from application.usecases.replay_search import ReplayFlightSearchUseCase
 from application.usecases.searches_for_flights import FlightSearchUseCase
+from domain.entities.flight import Flight
+from domain.entities.flight_table import FlightTable
+from infrastructure.base_browser import BrowserLauncher
+from infrastructure.config_browser import MetricsConfig, PriceStoreConfig, ReplayConfig, ServerConfig
+from infrastructure.metrics import RecordingTracer, Tracer
+from infrastructure.price_store import PriceStore
 from infrastructure.schemas.search import FlightSearchRequest, Passenger
+from infrastructure.sinks import NdjsonSink
+from infrastructure.structured_logger import correlation_scope
 from settings.containers import get_container
 
 
-async def main() -> None:
+async def main(
+    ndjson_path: Optional[str] = None,
+    max_results: Optional[int] = None,
+    fan_out: bool = False,
+    trace_path: Optional[str] = None
+) -> list[Flight]:
     container = get_container()
-    flight_search_uc = container.resolve(FlightSearchUseCase)
+    if trace_path:
+        container.resolve(MetricsConfig).enabled = True
     flight_data = FlightSearchRequest(
         departure = 'London',
         arrival = 'Chicago',
@@ -20,11 +41,77 @@ async def main() -> None:
         cabinType = 'economy',
         url = 'https://www.united.com/en/gb'
     )
-    flights = await flight_search_uc.execute(flight_data)
+    try:
+        if fan_out:
+            result = await container.resolve(FanOutSearch).search(flight_data)
+            for provider in result.providers:
+                print(f"{provider.provider}: {provider.status.value}, {len(provider.flights)} flights in {provider.elapsed:.1f}s")
+            flights = result.flights
+        elif ndjson_path:
+            flights = await stream_to_ndjson(container.resolve(FlightSearchUseCase), flight_data, ndjson_path, max_results)
+        elif container.resolve(ReplayConfig).enabled:
+            replay = container.resolve(ReplayFlightSearchUseCase)
+            try:
+                flights = await replay.execute(flight_data)
+            finally:
+                await replay.close()
+        else:
+            flights = await container.resolve(CachedFlightSearchUseCase).execute(flight_data)
+    finally:
+        await container.resolve(BrowserLauncher).close()
+        tracer = container.resolve(Tracer)
+        if trace_path and isinstance(tracer, RecordingTracer):
+            tracer.export_trace(trace_path)
+    if container.resolve(PriceStoreConfig).enabled:
+        store = container.resolve(PriceStore)
+        try:
+            await store.record(flight_data, flights)
+        finally:
+            store.close()
     with open('flights.json', 'w') as f:
-        json.dump([flight.to_dict() for flight in flights[:3]], f, indent=4)
+        json.dump([flight.to_dict() for flight in FlightTable.from_flights(flights).top(3, by='price')], f, indent=4)
     return flights
 
 
+async def stream_to_ndjson(
+    flight_search_uc: FlightSearchUseCase,
+    flight_data: FlightSearchRequest,
+    path: str,
+    max_results: Optional[int] = None
+) -> list[Flight]:
+    flights = []
+    with correlation_scope(), NdjsonSink(path) as sink:
+        async with aclosing(flight_search_uc.execute_stream(flight_data, max_results)) as stream:
+            async for flight in stream:
+                sink.write(flight)
+                flights.append(flight)
+    return flights
+
+
+async def serve(port: Optional[int] = None, unix_socket: Optional[str] = None, metrics: bool = False) -> None:
+    container = get_container()
+    if metrics:
+        container.resolve(MetricsConfig).enabled = True
+    config = container.resolve(ServerConfig)
+    if port is not None:
+        config.port = port
+    if unix_socket is not None:
+        config.unix_socket = unix_socket
+    await container.resolve(SearchDaemon).serve()
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Search united.com for flights')
+    parser.add_argument('--ndjson', help='Stream each flight to this NDJSON file as it is parsed')
+    parser.add_argument('--max-results', type=int, help='Stop streaming after this many flights')
+    parser.add_argument('--fan-out', action='store_true', help='Query every configured provider under a deadline')
+    parser.add_argument('--serve', action='store_true', help='Run the long-lived search daemon')
+    parser.add_argument('--port', type=int, help='Daemon TCP port')
+    parser.add_argument('--socket', help='Daemon Unix socket path, instead of TCP')
+    parser.add_argument('--metrics', action='store_true', help='Record step timings and serve them on /metrics')
+    parser.add_argument('--trace', help='Write the step timings of the search to this Chrome trace JSON file')
+    args = parser.parse_args()
+    if args.serve:
+        asyncio.run(serve(args.port, args.socket, args.metrics))
+    else:
+        asyncio.run(main(args.ndjson, args.max_results, args.fan_out, args.trace))
@@ -3,12 +3,44 @@ from logging import Logger
 
 import punq
 
+from application.daemon import SearchDaemon
+from application.providers.base import FlightProvider
+from application.providers.fan_out import FanOutSearch
+from application.providers.united import UnitedProvider
+from application.usecases.cached_search import CachedFlightSearchUseCase
+from application.usecases.process_pool import ShardedFlightSearch
+from application.usecases.replay_search import ReplayFlightSearchUseCase
 from application.usecases.searches_for_flights import FlightSearchUseCase
+from application.usecases.sweep import FlightSweepUseCase
 from infrastructure.base_browser import BrowserLauncher
 from infrastructure.browser import BrowserManager
 from infrastructure.browser_service import BrowserService
-from infrastructure.config_browser import BrowserConfig, SelectorConfig
-from infrastructure.error_handler import ConsoleLogger
+from infrastructure.config_browser import (
+    BrowserConfig,
+    CacheConfig,
+    DeepLinkConfig,
+    FanOutConfig,
+    InterceptConfig,
+    LogConfig,
+    MetricsConfig,
+    PacingConfig,
+    PriceStoreConfig,
+    ReplayConfig,
+    ProcessPoolConfig,
+    RetryConfig,
+    SelectorConfig,
+    ServerConfig,
+    SessionConfig,
+)
+from infrastructure.error_handler import ErrorHandler
+from infrastructure.http_replay import ReplayClient, TokenHarvester
+from infrastructure.locators import SelectorProfile
+from infrastructure.metrics import Tracer, build_tracer
+from infrastructure.pacing import Pacer, build_pacer
+from infrastructure.price_store import PriceStore
+from infrastructure.result_cache import DiskResultCache, MemoryResultCache, ResultCache
+from infrastructure.session_store import SessionStore
+from infrastructure.structured_logger import StructuredLogger
 
 
 @lru_cache(1)
@@ -29,20 +61,161 @@ def _init_container() -> punq.Container:
     container.register(BrowserConfig, instance=BrowserConfig(), scope=punq.Scope.singleton)
     
     container.register(SelectorConfig, instance=SelectorConfig(), scope=punq.Scope.singleton)
+
+    container.register(DeepLinkConfig, instance=DeepLinkConfig(), scope=punq.Scope.singleton)
+
+    container.register(CacheConfig, instance=CacheConfig(), scope=punq.Scope.singleton)
+
+    container.register(InterceptConfig, instance=InterceptConfig(), scope=punq.Scope.singleton)
+
+    container.register(PacingConfig, instance=PacingConfig(), scope=punq.Scope.singleton)
+
+    container.register(MetricsConfig, instance=MetricsConfig(), scope=punq.Scope.singleton)
+
+    container.register(ServerConfig, instance=ServerConfig(), scope=punq.Scope.singleton)
+
+    container.register(ProcessPoolConfig, instance=ProcessPoolConfig(), scope=punq.Scope.singleton)
+
+    container.register(SessionConfig, instance=SessionConfig(), scope=punq.Scope.singleton)
+
+    container.register(RetryConfig, instance=RetryConfig(), scope=punq.Scope.singleton)
+
+    container.register(LogConfig, instance=LogConfig(), scope=punq.Scope.singleton)
+
+    container.register(PriceStoreConfig, instance=PriceStoreConfig(), scope=punq.Scope.singleton)
+
+    container.register(FanOutConfig, instance=FanOutConfig(), scope=punq.Scope.singleton)
+
+    container.register(ReplayConfig, instance=ReplayConfig(), scope=punq.Scope.singleton)
     
     # Registration of abstractions with implementations
-    container.register(Logger, factory=ConsoleLogger)
-    container.register(BrowserLauncher, factory=BrowserManager)
+    # Singletons below are built on first resolve, so callers can adjust the
+    # configurations above first, e.g. from command line options
+
+    # One writer thread per process, shared by every component
+    container.register(
+        Logger, factory=lambda: StructuredLogger(container.resolve(LogConfig)), scope=punq.Scope.singleton
+    )
+    # The launcher owns the warm browser pool, so it must outlive every search
+    container.register(BrowserLauncher, factory=lambda: BrowserManager(
+        config=container.resolve(BrowserConfig),
+        logger=container.resolve(Logger),
+        sessions=SessionStore(container.resolve(SessionConfig)),
+    ), scope=punq.Scope.singleton)
     
+    # Shared by every session so per-origin rate limits hold across concurrent searches
+    container.register(Pacer, factory=lambda: build_pacer(container.resolve(PacingConfig)), scope=punq.Scope.singleton)
+
+    # Shared by every session so histograms aggregate across searches
+    container.register(Tracer, factory=lambda: build_tracer(container.resolve(MetricsConfig)), scope=punq.Scope.singleton)
+
+    # Shared by every session so evidence still being written is tracked in one place
+    container.register(ErrorHandler, factory=lambda: ErrorHandler(
+        logger=container.resolve(Logger),
+        config=container.resolve(RetryConfig)
+    ), scope=punq.Scope.singleton)
+
+    # Shared by every session so selector resolve costs aggregate across searches
+    container.register(SelectorProfile, instance=SelectorProfile(), scope=punq.Scope.singleton)
+
     container.register(BrowserService, factory=lambda: BrowserService(
         launcher=container.resolve(BrowserLauncher),
         logger=container.resolve(Logger),
-        selector_config=container.resolve(SelectorConfig)
+        selector_config=container.resolve(SelectorConfig),
+        intercept_config=container.resolve(InterceptConfig),
+        pacer=container.resolve(Pacer),
+        tracer=container.resolve(Tracer),
+        metrics_config=container.resolve(MetricsConfig),
+        error_handler=container.resolve(ErrorHandler),
+        selector_profile=container.resolve(SelectorProfile)
     ))
     
     container.register(FlightSearchUseCase, factory=lambda: FlightSearchUseCase(
         browser_service=container.resolve(BrowserService),
-        logger=container.resolve(Logger)
+        logger=container.resolve(Logger),
+        deep_link=container.resolve(DeepLinkConfig),
+        retry=container.resolve(RetryConfig)
     ))
     
+    # One connection per process, opened on first use
+    container.register(
+        PriceStore, factory=lambda: PriceStore(container.resolve(PriceStoreConfig).path), scope=punq.Scope.singleton
+    )
+
+    container.register(ResultCache, factory=lambda: _build_result_cache(container.resolve(CacheConfig)), scope=punq.Scope.singleton)
+
+    # Singleton so that stats and in-flight scrapes are shared by every caller
+    container.register(CachedFlightSearchUseCase, factory=lambda: CachedFlightSearchUseCase(
+        use_case=container.resolve(FlightSearchUseCase),
+        cache=container.resolve(ResultCache),
+        config=container.resolve(CacheConfig),
+        logger=container.resolve(Logger)
+    ), scope=punq.Scope.singleton)
+
+    container.register(FlightSweepUseCase, factory=lambda: FlightSweepUseCase(
+        use_case=container.resolve(FlightSearchUseCase),
+        cache=container.resolve(ResultCache),
+        cache_config=container.resolve(CacheConfig),
+        logger=container.resolve(Logger)
+    ))
+
+    # Singleton so every caller shares the harvested tokens and the HTTP connection pool
+    container.register(ReplayFlightSearchUseCase, factory=lambda: ReplayFlightSearchUseCase(
+        client=_build_replay_client(container),
+        fallback=container.resolve(FlightSearchUseCase),
+        intercept=container.resolve(InterceptConfig),
+        logger=container.resolve(Logger)
+    ), scope=punq.Scope.singleton)
+
+    container.register(FanOutSearch, factory=lambda: FanOutSearch(
+        providers=_build_providers(container),
+        config=container.resolve(FanOutConfig),
+        logger=container.resolve(Logger)
+    ))
+
+    container.register(ShardedFlightSearch, factory=lambda: ShardedFlightSearch(
+        config=container.resolve(ProcessPoolConfig),
+        logger=container.resolve(Logger)
+    ))
+
+    container.register(SearchDaemon, factory=lambda: SearchDaemon(
+        use_case=container.resolve(FlightSearchUseCase),
+        launcher=container.resolve(BrowserLauncher),
+        config=container.resolve(ServerConfig),
+        logger=container.resolve(Logger),
+        tracer=container.resolve(Tracer)
+    ))
+
     return container
+
+
+# One factory per provider name usable in FanOutConfig.providers
+_PROVIDERS = {
+    'united': lambda container: UnitedProvider(use_case=container.resolve(FlightSearchUseCase)),
+}
+
+
+def _build_providers(container: punq.Container) -> list[FlightProvider]:
+    names = container.resolve(FanOutConfig).providers
+    if not names:
+        raise ValueError(f"FanOutConfig.providers is empty, expected some of {sorted(_PROVIDERS)}")
+    unknown = [name for name in names if name not in _PROVIDERS]
+    if unknown:
+        raise ValueError(f"Unknown providers {unknown}, expected some of {sorted(_PROVIDERS)}")
+    return [_PROVIDERS[name](container) for name in names]
+
+
+def _build_replay_client(container: punq.Container) -> ReplayClient:
+    launcher = container.resolve(BrowserLauncher)
+    config = container.resolve(ReplayConfig)
+    deep_link = container.resolve(DeepLinkConfig)
+    logger = container.resolve(Logger)
+    harvester = TokenHarvester(launcher, deep_link, container.resolve(InterceptConfig), config, logger)
+    return ReplayClient(launcher, harvester, deep_link, config, logger)
+
+
+def _build_result_cache(config: CacheConfig) -> ResultCache:
+    max_age = config.ttl + config.stale_while_revalidate
+    if config.disk_path:
+        return DiskResultCache(max_entries=config.max_entries, max_age=max_age, directory=config.disk_path)
+    return MemoryResultCache(max_entries=config.max_entries, max_age=max_age)
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+
+import pytest
+
+pytest.importorskip('playwright')
+
+from application.usecases.cached_search import CachedFlightSearchUseCase
+from domain.entities.flight import Flight
+from infrastructure.config_browser import CacheConfig
+from infrastructure.result_cache import MemoryResultCache
+from infrastructure.schemas.search import FlightSearchRequest, Passenger
+
+
+FLIGHT = Flight('UA 958', '11:45', '08:30', '9H', '£1,334', 'NONSTOP')
+
+
+class FakeSearch:
+    """
+    Stands in for FlightSearchUseCase: counts scrapes and holds each one
+    until `release` is set.
+    """
+    def __init__(self, flights: list[Flight]):
+        self.flights = flights
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def execute(self, flight_data: FlightSearchRequest) -> list[Flight]:
+        self.calls += 1
+        await self.release.wait()
+        return self.flights
+
+
+def _request(departure: str = 'London') -> FlightSearchRequest:
+    return FlightSearchRequest('https://example.test', departure, 'Chicago', '2025-10-22', [Passenger('Adults', 1)])
+
+
+def _cached(search: FakeSearch, **config) -> CachedFlightSearchUseCase:
+    return CachedFlightSearchUseCase(
+        search, MemoryResultCache(max_entries=8, max_age=3600), CacheConfig(**config), logging.getLogger('test')
+    )
+
+
+def test_concurrent_identical_searches_share_one_scrape():
+    async def scenario():
+        search = FakeSearch([FLIGHT])
+        cached = _cached(search)
+        callers = [asyncio.create_task(cached.execute(_request(city))) for city in ('London', ' london', 'LONDON')]
+        await asyncio.sleep(0)
+        search.release.set()
+        results = await asyncio.gather(*callers)
+
+        assert search.calls == 1
+        assert results == [[FLIGHT]] * 3
+        assert (cached.stats.misses, cached.stats.coalesced) == (1, 2)
+
+        assert await cached.execute(_request()) == [FLIGHT]
+        assert search.calls == 1
+        assert cached.stats.hits == 1
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_scrape():
+    async def scenario():
+        search = FakeSearch([FLIGHT])
+        cached = _cached(search)
+        first = asyncio.create_task(cached.execute(_request()))
+        second = asyncio.create_task(cached.execute(_request()))
+        await asyncio.sleep(0)
+        first.cancel()
+        search.release.set()
+
+        assert await second == [FLIGHT]
+        assert first.cancelled()
+        assert search.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_empty_results_are_not_cached():
+    async def scenario():
+        search = FakeSearch([])
+        search.release.set()
+        cached = _cached(search)
+
+        assert await cached.execute(_request()) == []
+        assert await cached.execute(_request()) == []
+        assert search.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_stale_result_is_served_while_refreshing():
+    async def scenario():
+        search = FakeSearch([FLIGHT])
+        search.release.set()
+        cached = _cached(search, ttl=0.0, stale_while_revalidate=3600.0)
+        await cached.execute(_request())
+
+        assert await cached.execute(_request()) == [FLIGHT]
+        assert cached.stats.stale_hits == 1
+        await asyncio.gather(*cached._inflight.values())
+        assert search.calls == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('playwright')
+
+from application.daemon import SearchDaemon
+from domain.entities.flight import Flight
+from infrastructure.config_browser import ServerConfig
+from infrastructure.locators import SelectorProfile
+
+
+FLIGHT = Flight('UA 958', '11:45', '08:30', '9H', '£1,334', 'NONSTOP')
+
+REQUEST = {
+    'url': 'https://example.test',
+    'departure': 'London',
+    'arrival': 'Chicago',
+    'departure_date': '2025-10-22',
+    'passengers': [{'category': 'Adults', 'count': 1}],
+}
+
+
+class FakeSearch:
+    """
+    Stands in for FlightSearchUseCase: streams `flights` once `release` is set.
+    """
+    def __init__(self, flights: list[Flight]):
+        self.flights = flights
+        self.release = asyncio.Event()
+        self.release.set()
+        self.browser_service = SimpleNamespace(selector_profile=SelectorProfile())
+
+    async def execute_stream(self, flight_data):
+        await self.release.wait()
+        for flight in self.flights:
+            yield flight
+
+
+class FakeLauncher:
+    closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+async def _start(search: FakeSearch, **config) -> SearchDaemon:
+    config = ServerConfig(port=0, drain_timeout=0.1, **config)
+    daemon = SearchDaemon(search, FakeLauncher(), config, logging.getLogger('test'))
+    await daemon.start()
+    return daemon
+
+
+async def _send(daemon: SearchDaemon, method: str, target: str, body: bytes = b'') -> tuple[int, bytes]:
+    host, port = daemon._server.sockets[0].getsockname()[:2]
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f'{method} {target} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n'.encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), payload
+
+
+def test_search_streams_ndjson():
+    async def scenario():
+        daemon = await _start(FakeSearch([FLIGHT, FLIGHT]))
+        try:
+            status, payload = await _send(daemon, 'POST', '/search?priority=1', json.dumps(REQUEST).encode())
+        finally:
+            await daemon.shutdown()
+
+        assert status == 200
+        lines = [json.loads(line) for line in payload.split(b'\r\n') if line.startswith(b'{')]
+        assert lines[:2] == [FLIGHT.to_dict()] * 2
+        assert lines[-1] == {'status': 'done', 'count': 2}
+        assert daemon.completed == 1
+        assert daemon.launcher.closed
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize('body, target', [
+    (b'not json', '/search'),
+    (b'[1, 2]', '/search'),
+    (json.dumps({**REQUEST, 'priority': 'high'}).encode(), '/search'),
+    (json.dumps(REQUEST).encode(), '/search?priority=high'),
+    (json.dumps({'url': 'https://example.test'}).encode(), '/search'),
+])
+def test_malformed_searches_are_bad_requests(body, target):
+    async def scenario():
+        daemon = await _start(FakeSearch([FLIGHT]))
+        try:
+            status, payload = await _send(daemon, 'POST', target, body)
+        finally:
+            await daemon.shutdown()
+
+        assert status == 400
+        assert 'error' in json.loads(payload)
+
+    asyncio.run(scenario())
+
+
+def test_priority_in_the_body_is_accepted():
+    async def scenario():
+        daemon = await _start(FakeSearch([FLIGHT]))
+        try:
+            status, _ = await _send(daemon, 'POST', '/search', json.dumps({**REQUEST, 'priority': 2}).encode())
+        finally:
+            await daemon.shutdown()
+
+        assert status == 200
+
+    asyncio.run(scenario())
+
+
+def test_oversized_body_is_rejected():
+    async def scenario():
+        daemon = await _start(FakeSearch([FLIGHT]), max_body=16)
+        try:
+            status, _ = await _send(daemon, 'POST', '/search', json.dumps(REQUEST).encode())
+        finally:
+            await daemon.shutdown()
+
+        assert status == 413
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_is_rejected():
+    async def scenario():
+        search = FakeSearch([FLIGHT])
+        search.release.clear()
+        daemon = await _start(search, workers=1, max_queue=1)
+        body = json.dumps(REQUEST).encode()
+        try:
+            running = asyncio.create_task(_send(daemon, 'POST', '/search', body))
+            while daemon.running == 0:
+                await asyncio.sleep(0.01)
+            queued = asyncio.create_task(_send(daemon, 'POST', '/search', body))
+            while daemon._queue.qsize() == 0:
+                await asyncio.sleep(0.01)
+
+            status, payload = await _send(daemon, 'POST', '/search', body)
+            assert status == 429
+            assert json.loads(payload)['queued'] == 1
+
+            search.release.set()
+            assert [(await task)[0] for task in (running, queued)] == [200, 200]
+        finally:
+            await daemon.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_readiness_and_unknown_paths():
+    async def scenario():
+        daemon = await _start(FakeSearch([]))
+        try:
+            assert (await _send(daemon, 'GET', '/ready'))[0] == 200
+            assert (await _send(daemon, 'GET', '/search'))[0] == 405
+            assert (await _send(daemon, 'GET', '/nowhere'))[0] == 404
+            assert (await _send(daemon, 'GET', '/metrics'))[0] == 404
+            daemon.accepting = False
+            assert (await _send(daemon, 'GET', '/ready'))[0] == 503
+            assert (await _send(daemon, 'POST', '/search', json.dumps(REQUEST).encode()))[0] == 503
+        finally:
+            await daemon.shutdown()
+
+    asyncio.run(scenario())
@@ -0,0 +1,57 @@
+from benchmarks.fixtures import FixtureFlight, render_payload
+from infrastructure.config_browser import InterceptConfig
+from infrastructure.data_parser import flights_from_payload
+
+
+SYMBOLS = InterceptConfig().currency_symbols
+
+
+def test_payload_flights_are_formatted_like_the_cards():
+    payload = render_payload([FixtureFlight(958, '08:30', '11:45', 9, 15, 1334, 1)], '2025-10-22')
+
+    [flight] = flights_from_payload(payload, SYMBOLS, ('ECONOMY',))
+
+    assert flight.airline == 'UA 958 (Boeing 767-300)'
+    assert (flight.departure, flight.arrival) == ('08:30', '11:45')
+    assert flight.duration == '9H, 15M'
+    assert flight.stop == '1 STOP'
+    assert flight.price == '£1,334'
+    assert (flight.price_minor, flight.currency, flight.stops) == (133400, 'GBP', 1)
+
+
+def test_price_comes_from_the_requested_products():
+    payload = render_payload([FixtureFlight(958, '08:30', '11:45', 9, 0, 100, 0)], '2025-10-22')
+
+    assert flights_from_payload(payload, SYMBOLS, ('BUSINESS',))[0].price == '£300'
+    # without a product filter the cheapest price of any product wins
+    assert flights_from_payload(payload, SYMBOLS)[0].price == '£100'
+
+
+def test_products_without_a_price_are_ignored():
+    payload = {'data': {'Trips': [{'Flights': [{
+        'FlightNumber': '1',
+        'MarketingCarrier': 'UA',
+        'Products': [
+            {'ProductType': 'ECONOMY', 'Prices': [{'Amount': None, 'Currency': 'USD'}]},
+            {'ProductType': 'ECONOMY', 'Prices': [{'Amount': 250.0, 'Currency': 'USD'}]},
+        ],
+    }]}]}}
+
+    [flight] = flights_from_payload(payload, SYMBOLS, ('ECONOMY',))
+
+    assert flight.price == '$250'
+    assert flight.stop == 'NONSTOP'
+
+
+def test_unmatched_products_leave_the_price_empty():
+    payload = render_payload([FixtureFlight(958, '08:30', '11:45', 9, 0, 100, 0)], '2025-10-22')
+
+    [flight] = flights_from_payload(payload, SYMBOLS, ('FIRST',))
+
+    assert flight.price is None
+
+
+def test_missing_or_malformed_payload_has_no_flights():
+    assert flights_from_payload(None, SYMBOLS) == []
+    assert flights_from_payload({}, SYMBOLS) == []
+    assert flights_from_payload({'data': {'Trips': None}}, SYMBOLS) == []
@@ -0,0 +1,60 @@
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from infrastructure.config_browser import DeepLinkConfig
+from infrastructure.deep_link import build_results_url
+from infrastructure.schemas.search import FlightSearchRequest, Passenger
+
+
+def _request(**overrides) -> FlightSearchRequest:
+    fields = {
+        'url': 'https://www.united.com/en/gb/',
+        'departure': 'London',
+        'arrival': 'Chicago',
+        'departure_date': '2025-10-22',
+        'passengers': [Passenger('Adults', 1), Passenger('Children', 1)],
+    }
+    fields.update(overrides)
+    return FlightSearchRequest(**fields)
+
+
+def test_results_url_encodes_the_search():
+    url = urlsplit(build_results_url(_request(), DeepLinkConfig()))
+    params = {name: values[0] for name, values in parse_qs(url.query).items()}
+
+    assert f'{url.scheme}://{url.netloc}{url.path}' == 'https://www.united.com/en/gb/fsr/choose-flights'
+    assert params['f'] == 'LONDON'
+    assert params['t'] == 'CHICAGO'
+    assert params['d'] == '2025-10-22'
+    assert params['tt'] == '1'
+    assert params['sc'] == '7'
+    assert params['px'] == '1,0,0,0,0,1,0,0'
+    assert 'r' not in params
+
+
+def test_return_date_makes_a_round_trip():
+    url = build_results_url(_request(return_date='2025-10-29', cabinType='business'), DeepLinkConfig())
+    params = {name: values[0] for name, values in parse_qs(urlsplit(url).query).items()}
+
+    assert params['r'] == '2025-10-29'
+    assert params['tt'] == '0'
+    assert params['sc'] == '2'
+
+
+def test_repeated_categories_are_summed():
+    request = _request(passengers=[Passenger('Adults', 1), Passenger('Adults', 2)])
+    url = build_results_url(request, DeepLinkConfig())
+
+    assert parse_qs(urlsplit(url).query)['px'] == ['3,0,0,0,0,0,0,0']
+
+
+@pytest.mark.parametrize('overrides', [
+    {'cabinType': 'premium'},
+    {'passengers': [Passenger('Pets', 1)]},
+    {'departure_date': '22-10-2025'},
+    {'departure_date': ''},
+])
+def test_unsupported_searches_are_rejected(overrides):
+    with pytest.raises(ValueError):
+        build_results_url(_request(**overrides), DeepLinkConfig())